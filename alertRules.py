@@ -0,0 +1,209 @@
+import time
+from collections import namedtuple, deque
+import numpy as np
+from packetSchema import SCHEMA, as_text
+
+Alert = namedtuple("Alert", ["time", "rule", "severity", "message", "active"])
+
+FLIGHT_PHASES = ["LAUNCH_PAD", "ASCENT", "APOGEE", "DESCENT", "PROBE_RELEASE", "LANDED"]
+# A lossy link can miss a short phase such as APOGEE entirely, so any move forward is expected
+SW_STATE_TRANSITIONS = {phase: set(FLIGHT_PHASES[i + 1:]) for i, phase in enumerate(FLIGHT_PHASES)}
+# The payload is held (N) until it is released (R), and is never re-stowed in flight
+PL_STATE_TRANSITIONS = {"N": {"R"}}
+
+
+def _run_lengths(condition, carry):
+    # Length of the run of True ending at each index, continuing `carry` from the previous batch
+    index = np.arange(len(condition))
+    last_break = np.maximum.accumulate(np.where(condition, -1, index))
+    runs = index - last_break
+    runs[last_break < 0] += carry
+    runs[~condition] = 0
+    return runs
+
+
+class ThresholdRule:
+
+    def __init__(self, name, expression, minimum=None, maximum=None, debounce=3, severity="warning"):
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self.debounce = debounce
+        self.severity = severity
+        # Compiled once; evaluated over whole batches with the column arrays as variables
+        self.code = compile(expression, f"<rule {name}>", "eval")
+        field_names = {field.name for field in SCHEMA}
+        self.fields = [name_ for name_ in self.code.co_names if name_ in field_names]
+        self.active = False
+        self.bad_run = 0
+        self.good_run = 0
+
+    def evaluate(self, columns, timestamps):
+        values = np.asarray(eval(self.code, {"np": np}, columns), dtype=np.float64)
+        bad = np.zeros(len(values), dtype=bool)
+        if self.minimum is not None:
+            bad |= values < self.minimum
+        if self.maximum is not None:
+            bad |= values > self.maximum
+        good = ~bad & np.isfinite(values)
+
+        bad_runs = _run_lengths(bad, self.bad_run)
+        good_runs = _run_lengths(good, self.good_run)
+        self.bad_run = int(bad_runs[-1]) if len(values) else self.bad_run
+        self.good_run = int(good_runs[-1]) if len(values) else self.good_run
+
+        # Only the few positions where a run crosses the debounce length need a Python loop
+        fire = np.flatnonzero(bad_runs == self.debounce)
+        clear = np.flatnonzero(good_runs == self.debounce)
+        alerts = []
+        for position in np.union1d(fire, clear).tolist():
+            if bad_runs[position] == self.debounce and not self.active:
+                self.active = True
+                alerts.append(Alert(float(timestamps[position]), self.name, self.severity,
+                                    f"{self.name}: {values[position]:.2f}", True))
+            elif good_runs[position] == self.debounce and self.active:
+                self.active = False
+                alerts.append(Alert(float(timestamps[position]), self.name, "info", f"{self.name} cleared", False))
+        return alerts
+
+
+class TransitionRule:
+
+    def __init__(self, field, allowed=None, debounce=2, severity="warning"):
+        self.name = f"{field} transition"
+        self.field = field
+        self.fields = [field]
+        self.allowed = allowed  # {from_state: {to_state, ...}}; None accepts every change
+        # A new state only counts once this many consecutive packets agree, so one corrupted value is ignored
+        self.debounce = debounce
+        self.severity = severity
+        self.state = None
+        self.candidate = None
+        self.run = 0
+        self.active = False
+
+    def evaluate(self, columns, timestamps):
+        states = columns[self.field]
+        if len(states) == 0:
+            return []
+        # Walk the runs of equal states rather than every packet, carrying the last run across batches
+        starts = np.flatnonzero(states[1:] != states[:-1]) + 1
+        alerts = []
+        for start, end in zip([0] + starts.tolist(), starts.tolist() + [len(states)]):
+            state = as_text(states[start])
+            carried = self.run if start == 0 and state == self.candidate else 0
+            self.candidate = state
+            self.run = carried + end - start
+            if state == self.state or self.run < self.debounce:
+                continue
+            position = start + max(self.debounce - carried, 1) - 1
+            before, self.state = self.state, state
+            if before is None:
+                continue
+            if self.allowed is None or state in self.allowed.get(before, ()):
+                alerts.append(Alert(float(timestamps[position]), self.name, "info", f"{self.field}: {before} -> {state}",
+                                    False))
+            else:
+                alerts.append(Alert(float(timestamps[position]), self.name, self.severity,
+                                    f"Unexpected {self.field}: {before} -> {state}", False))
+        return alerts
+
+
+class StaleLinkRule:
+
+    def __init__(self, timeout=5.0, severity="critical"):
+        self.name = "Stale link"
+        self.fields = []
+        self.timeout = timeout
+        self.severity = severity
+        self.last_packet = None
+        self.active = False
+
+    def evaluate(self, columns, timestamps):
+        if len(timestamps):
+            self.last_packet = float(timestamps[-1])
+            if self.active:
+                self.active = False
+                return [Alert(self.last_packet, self.name, "info", "Link restored", False)]
+        return []
+
+    def reset(self, now):
+        # Time out from when reading starts, not from the last packet of a resumed session
+        self.last_packet = now
+        self.active = False
+
+    def check(self, now):
+        if self.last_packet is None or self.active or now - self.last_packet < self.timeout:
+            return []
+        self.active = True
+        return [Alert(now, self.name, self.severity, f"No packets for {now - self.last_packet:.0f} s", True)]
+
+
+def default_rules():
+    # Rules keep state between batches, so every engine gets its own instances
+    return [
+        ThresholdRule("Low voltage", "Voltage", minimum=5.0, severity="critical"),
+        ThresholdRule("Altitude out of range", "Altitude", minimum=-50.0, maximum=1000.0),
+        ThresholdRule("Spin rate", "np.sqrt(GYRO_R ** 2 + GYRO_P ** 2 + GYRO_Y ** 2)", maximum=360.0),
+        TransitionRule("SW_STATE", SW_STATE_TRANSITIONS),
+        TransitionRule("PL_STATE", PL_STATE_TRANSITIONS),
+        StaleLinkRule(),
+    ]
+
+
+class AlertEngine:
+
+    def __init__(self, rules=None, log_path=None, history=50):
+        self.title = "Alerts"
+        self.rules = rules if rules is not None else default_rules()
+        self.fields = sorted({field for rule in self.rules for field in rule.fields})
+        self.log_path = log_path
+        self.recent = deque(maxlen=history)
+        self.callbacks = []
+        # Set while restored history is fed through: rules catch up on state, but alerts the previous
+        # run already logged are not reported again
+        self.replaying = False
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def update_batch(self, *args):
+        *series, timestamps = args
+        columns = dict(zip(self.fields, series))
+        alerts = []
+        for rule in self.rules:
+            alerts.extend(rule.evaluate(columns, timestamps))
+        self.publish(alerts)
+
+    def update_gui(self):
+        pass
+
+    def reset_stale(self, now=None):
+        now = time.time() if now is None else now
+        for rule in self.rules:
+            if isinstance(rule, StaleLinkRule):
+                rule.reset(now)
+
+    def check_stale(self, now=None):
+        now = time.time() if now is None else now
+        alerts = []
+        for rule in self.rules:
+            if isinstance(rule, StaleLinkRule):
+                alerts.extend(rule.check(now))
+        self.publish(alerts)
+
+    def publish(self, alerts):
+        if not alerts or self.replaying:
+            return
+        alerts.sort(key=lambda alert: alert.time)
+        self.recent.extend(alerts)
+        if self.log_path:
+            with open(self.log_path, mode='a') as file:
+                for alert in alerts:
+                    stamp = time.strftime('%H:%M:%S', time.localtime(alert.time))
+                    file.write(f"{stamp} [{alert.severity}] {alert.message}\n")
+        for callback in self.callbacks:
+            callback(alerts)
+
+    def active(self):
+        return [rule.name for rule in self.rules if rule.active]
@@ -0,0 +1,280 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import numpy as np
+from communication import Communication
+from frameReader import FrameReader
+from telemetryStore import FIELDS
+
+
+def make_packet(packet_count, extra_fields=0, corrupt=False, rng=random):
+    fields = ["1002", time.strftime("%H:%M:%S"), str(packet_count), "ASCENT", "N",
+              f"{rng.uniform(0, 600):.1f}", f"{rng.uniform(0, 50):.1f}", f"{rng.uniform(3, 9):.2f}",
+              f"{rng.uniform(-360, 360):.1f}", f"{rng.uniform(-360, 360):.1f}", f"{rng.uniform(-360, 360):.1f}",
+              f"{rng.uniform(950, 1050):.1f}"]
+    fields += [f"{rng.random():.3f}" for _ in range(extra_fields)]
+    packet = (",".join(fields) + ",POTATO\r\n").encode()
+    if corrupt:
+        # Flip a few bytes to non-UTF-8 garbage, like a noisy radio link would
+        packet = bytearray(packet)
+        for _ in range(3):
+            packet[rng.randrange(len(packet) - 8)] = rng.randrange(0x80, 0x100)
+        packet = bytes(packet)
+    return packet
+
+
+def make_stream(packets, extra_fields=0, corruption=0.0, seed=1002):
+    rng = random.Random(seed)
+    return [make_packet(i, extra_fields, rng.random() < corruption, rng) for i in range(packets)]
+
+
+def percentiles(samples_ns):
+    if not samples_ns:
+        return {}
+    values = np.asarray(samples_ns, dtype=np.float64) / 1000.0
+    p50, p90, p99, p999 = np.percentile(values, [50, 90, 99, 99.9])
+    return {"p50_us": p50, "p90_us": p90, "p99_us": p99, "p999_us": p999, "max_us": float(values.max())}
+
+
+def rss_bytes():
+    # Current resident set from /proc where there is one, else the peak the OS reports
+    try:
+        with open('/proc/self/statm') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def sample_memory(samples, start, label):
+    samples.append({"t": time.perf_counter() - start, "stage": label, "rss_bytes": rss_bytes()})
+
+
+def bench_framer(stream, chunk_size):
+    data = b"".join(stream)
+    reader = FrameReader()
+    latencies = []
+    frames = 0
+    start = time.perf_counter()
+    for offset in range(0, len(data), chunk_size):
+        t0 = time.perf_counter_ns()
+        frames += len(reader.feed(data[offset:offset + chunk_size]))
+        latencies.append(time.perf_counter_ns() - t0)
+    elapsed = time.perf_counter() - start
+    return {"frames": frames, "dropped": reader.dropped_frames, "seconds": elapsed,
+            "packets_per_s": frames / elapsed, "bytes_per_s": len(data) / elapsed,
+            "chunk_latency": percentiles(latencies)}
+
+
+def bench_parse(stream, workdir, memory, mem_start):
+    comm = Communication('bench', csv_filename=os.path.join(workdir, 'parse.csv'))
+    comm.logger.start()
+    frames = [packet.strip() for packet in stream]
+    latencies = []
+    start = time.perf_counter()
+    for i, frame in enumerate(frames):
+        t0 = time.perf_counter_ns()
+        comm.handle_frames((frame,))
+        latencies.append(time.perf_counter_ns() - t0)
+        if i % 10000 == 0:
+            sample_memory(memory, mem_start, "parse")
+    elapsed = time.perf_counter() - start
+    comm.logger.stop()
+    return comm, {"packets": len(frames), "stored": comm.store.count, "seconds": elapsed,
+                  "packets_per_s": len(frames) / elapsed, "packet_latency": percentiles(latencies),
+                  "csv_written": comm.logger.written, "csv_dropped": comm.logger.dropped}
+
+
+def bench_parse_memory(stream, workdir):
+    # tracemalloc slows parsing several-fold, so allocations are measured in their own untimed pass
+    comm = Communication('bench', csv_filename=os.path.join(workdir, 'memory.csv'))
+    comm.logger.start()
+    frames = [packet.strip() for packet in stream]
+    tracemalloc.start()
+    try:
+        comm.handle_frames(frames)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        comm.logger.stop()
+    return {"packets": len(frames), "current_bytes": current, "peak_bytes": peak,
+            "bytes_per_packet": current / len(frames) if frames else 0.0}
+
+
+def fill_store(stream, workdir):
+    # Later stages need a populated store even when the parse stage itself is skipped
+    comm = Communication('bench', csv_filename=os.path.join(workdir, 'parse.csv'))
+    comm.handle_frames([packet.strip() for packet in stream])
+    return comm
+
+
+def bench_getters(comm, rounds):
+    getters = [comm.getTime, comm.getPacketCount, comm.getSW_STATE, comm.getPL_STATE, comm.getAltitude,
+               comm.getTemperature, comm.getVoltage, comm.getGYRO_R, comm.getGYRO_P, comm.getGYRO_Y,
+               comm.getPressure]
+    latencies = []
+    for _ in range(rounds):
+        t0 = time.perf_counter_ns()
+        for getter in getters:
+            getter()
+        latencies.append(time.perf_counter_ns() - t0)
+    snapshots = []
+    for _ in range(rounds):
+        t0 = time.perf_counter_ns()
+        comm.latest_record()
+        snapshots.append(time.perf_counter_ns() - t0)
+    return {"rounds": rounds, "getters_per_round": len(getters), "round_latency": percentiles(latencies),
+            "snapshot_latency": percentiles(snapshots)}
+
+
+def bench_serial(stream, rate, baud_rate, workdir):
+    if not hasattr(os, 'openpty'):
+        return {"skipped": "pty not available on this platform"}
+    master, slave = os.openpty()
+    comm = Communication(os.ttyname(slave), baud_rate=baud_rate, csv_filename=os.path.join(workdir, 'serial.csv'))
+    reader = threading.Thread(target=comm.read)
+    reader.start()
+    time.sleep(0.2)
+
+    interval = 1.0 / rate if rate else 0.0
+    start = time.perf_counter()
+    for i, packet in enumerate(stream):
+        if interval:
+            delay = start + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        os.write(master, packet)
+    sent = time.perf_counter() - start
+
+    # Give the reader a moment to drain what is still in the pty
+    deadline = time.perf_counter() + 5
+    while comm.store.count + comm.frame_reader.dropped_frames < len(stream) and time.perf_counter() < deadline:
+        time.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    comm.stop_reading()
+    reader.join()
+    os.close(master)
+    os.close(slave)
+    return {"sent": len(stream), "received": comm.store.count, "dropped_frames": comm.frame_reader.dropped_frames,
+            "send_seconds": sent, "seconds": elapsed, "packets_per_s": comm.store.count / elapsed,
+            "bytes_per_s": comm.frame_reader.bytes_read / elapsed}
+
+
+def bench_render(comm, frames, batch, workdir):
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    from main import GroundStation
+
+    # GroundStation opens its CSV log in the working directory; keep it out of the tree
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        window = GroundStation()
+    finally:
+        os.chdir(cwd)
+    window.comm = comm
+    window.alerts.log_path = None
+    window.render_scheduler.store = comm.store
+    window.show()
+    app.processEvents()
+
+    rows = [[comm.store.columns[name][i] for name, dtype in FIELDS] for i in range(min(batch, len(comm.store)))]
+    frame_times = []
+    for _ in range(frames):
+        for row in rows:
+            comm.store.append(row)
+        t0 = time.perf_counter_ns()
+        window.render_scheduler.render_frame()
+        app.processEvents()
+        frame_times.append(time.perf_counter_ns() - t0)
+    # Frames with nothing new should cost next to nothing
+    idle_times = []
+    for _ in range(frames):
+        t0 = time.perf_counter_ns()
+        window.render_scheduler.render_frame()
+        idle_times.append(time.perf_counter_ns() - t0)
+    window.close()
+    return {"frames": frames, "packets_per_frame": len(rows), "history": len(window.altitudeGraph.buffer),
+            "frame_time": percentiles(frame_times), "idle_frame_time": percentiles(idle_times)}
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ground station ingest and rendering")
+    parser.add_argument('--packets', type=int, default=50000)
+    parser.add_argument('--extra-fields', type=int, default=0, help="extra numeric fields appended to each packet")
+    parser.add_argument('--corruption', type=float, default=0.0, help="fraction of packets with corrupted bytes")
+    parser.add_argument('--chunk-size', type=int, default=256, help="bytes per read for the framer stage")
+    parser.add_argument('--rate', type=float, default=0, help="packets/s for the serial stage, 0 for unthrottled")
+    parser.add_argument('--baud', type=int, default=115200)
+    parser.add_argument('--serial-packets', type=int, default=5000)
+    parser.add_argument('--render-frames', type=int, default=200)
+    parser.add_argument('--render-batch', type=int, default=30, help="packets arriving between frames")
+    parser.add_argument('--skip', nargs='*', default=[], choices=['framer', 'parse', 'getters', 'serial', 'render'])
+    parser.add_argument('--output', default='bench_output.json')
+    args = parser.parse_args()
+
+    stream = make_stream(args.packets, args.extra_fields, args.corruption)
+    results = {"revision": git_revision(), "timestamp": time.time(), "python": sys.version.split()[0],
+               "config": vars(args), "stages": {}}
+    memory = []
+    mem_start = time.perf_counter()
+    sample_memory(memory, mem_start, "start")
+
+    comm = None
+    with tempfile.TemporaryDirectory() as workdir:
+        if 'framer' not in args.skip:
+            results["stages"]["framer"] = bench_framer(stream, args.chunk_size)
+            sample_memory(memory, mem_start, "framer")
+        if 'parse' not in args.skip:
+            comm, results["stages"]["parse"] = bench_parse(stream, workdir, memory, mem_start)
+            sample_memory(memory, mem_start, "parse")
+            results["traced_memory"] = bench_parse_memory(stream, workdir)
+        elif 'getters' not in args.skip or 'render' not in args.skip:
+            comm = fill_store(stream, workdir)
+        if comm is not None and comm.store.count == 0:
+            # Timing the reject path would look like a fast parser
+            hint = " (--extra-fields frames do not match the packet schema)" if args.extra_fields else ""
+            parser.error(f"every generated packet was rejected by the parser{hint}; "
+                         "skip the parse, getters and render stages")
+        if 'getters' not in args.skip:
+            results["stages"]["getters"] = bench_getters(comm, 10000)
+        if 'serial' not in args.skip:
+            results["stages"]["serial"] = bench_serial(stream[:args.serial_packets], args.rate, args.baud, workdir)
+            sample_memory(memory, mem_start, "serial")
+        if 'render' not in args.skip:
+            results["stages"]["render"] = bench_render(comm, args.render_frames, args.render_batch, workdir)
+            sample_memory(memory, mem_start, "render")
+
+    results["memory"] = memory
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+
+    for stage, result in results["stages"].items():
+        rate = result.get("packets_per_s")
+        print(f"{stage:8s} " + (f"{rate:12.0f} packets/s" if rate else json.dumps(result)[:100]))
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
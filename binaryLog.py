@@ -0,0 +1,237 @@
+import argparse
+import json
+import os
+import struct
+import sys
+import time
+import numpy as np
+from packetSchema import PacketParser
+from replaySerial import MissionClock, parse_mission_time
+from telemetryStore import RECORD_DTYPE, RECEIVED
+
+MAGIC = b'TATERLOG'
+VERSION = 1
+INDEX_STRIDE = 1024
+INDEX_DTYPE = np.dtype([("record", np.int64), (RECEIVED, np.float64), ("PacketCount", np.int64)])
+
+
+def _describe(dtype):
+    return [[name, dtype.fields[name][0].str] for name in dtype.names]
+
+
+def _header_bytes(dtype):
+    descriptor = json.dumps({"version": VERSION, "fields": _describe(dtype)}).encode()
+    # Pad so the first record starts 8-byte aligned
+    length = len(MAGIC) + 4 + len(descriptor)
+    descriptor += b' ' * (-length % 8)
+    return MAGIC + struct.pack('<I', len(descriptor)) + descriptor
+
+
+def _read_header(file):
+    magic = file.read(len(MAGIC))
+    if magic != MAGIC:
+        raise ValueError(f"{file.name} is not a Taternauts binary log")
+    (length,) = struct.unpack('<I', file.read(4))
+    descriptor = json.loads(file.read(length))
+    dtype = np.dtype([(name, dtype) for name, dtype in descriptor["fields"]])
+    return dtype, len(MAGIC) + 4 + length
+
+
+class BinaryLogWriter:
+
+    def __init__(self, path, batch_size=256, flush_interval=1.0, fsync_interval=None):
+        self.path = path
+        self.index_path = path + '.idx'
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # None leaves durability to the OS until close(); otherwise flushes also fsync at most this often
+        self.fsync_interval = fsync_interval
+        self.last_fsync = time.monotonic()
+        self.batch = np.zeros(batch_size, dtype=RECORD_DTYPE)
+        self.pending = 0
+        self.file = None
+        self.index_file = None
+        self.records = 0
+        self.last_flush = time.monotonic()
+
+    def open(self):
+        if self.file is not None:
+            return
+        exists = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        if exists:
+            with open(self.path, 'rb') as file:
+                dtype, offset = _read_header(file)
+            if dtype != RECORD_DTYPE:
+                raise ValueError(f"{self.path} was written with a different packet schema")
+            self.records = (os.path.getsize(self.path) - offset) // RECORD_DTYPE.itemsize
+            # A crash mid-write can leave a partial record (or index entry) at the end; cut it off
+            # so appended records stay aligned
+            os.truncate(self.path, offset + self.records * RECORD_DTYPE.itemsize)
+            if os.path.exists(self.index_path):
+                entries = -(-self.records // INDEX_STRIDE)
+                if os.path.getsize(self.index_path) > entries * INDEX_DTYPE.itemsize:
+                    os.truncate(self.index_path, entries * INDEX_DTYPE.itemsize)
+        self.file = open(self.path, 'ab')
+        if not exists:
+            self.file.write(_header_bytes(RECORD_DTYPE))
+            if os.path.exists(self.index_path):
+                os.remove(self.index_path)
+        self.index_file = open(self.index_path, 'ab')
+
+    def append(self, packet, received=None):
+        if self.file is None:
+            self.open()
+        self.batch[self.pending] = (*packet, time.time() if received is None else received)
+        self.pending += 1
+        if self.pending == self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def extend(self, records):
+        if self.file is None:
+            self.open()
+        self.flush()
+        self._write(np.ascontiguousarray(records, dtype=RECORD_DTYPE))
+
+    def flush(self):
+        if self.pending:
+            self._write(self.batch[:self.pending])
+            self.pending = 0
+        if self.file is not None:
+            self.file.flush()
+            self.index_file.flush()
+            if self.fsync_interval is not None and time.monotonic() - self.last_fsync >= self.fsync_interval:
+                os.fsync(self.file.fileno())
+                os.fsync(self.index_file.fileno())
+                self.last_fsync = time.monotonic()
+        self.last_flush = time.monotonic()
+
+    def _write(self, records):
+        # Every INDEX_STRIDE-th record gets a sparse index entry for O(log n) range lookups
+        first = -self.records % INDEX_STRIDE
+        picks = np.arange(first, len(records), INDEX_STRIDE)
+        if len(picks):
+            entries = np.zeros(len(picks), dtype=INDEX_DTYPE)
+            entries["record"] = self.records + picks
+            entries[RECEIVED] = records[RECEIVED][picks]
+            entries["PacketCount"] = records["PacketCount"][picks]
+            self.index_file.write(entries.tobytes())
+        self.file.write(records.tobytes())
+        self.records += len(records)
+
+    def close(self):
+        if self.file is None:
+            return
+        self.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        self.index_file.close()
+        self.file = None
+        self.index_file = None
+
+
+class BinaryLogReader:
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            self.dtype, self.offset = _read_header(file)
+        count = (os.path.getsize(path) - self.offset) // self.dtype.itemsize
+        self.records = np.memmap(path, dtype=self.dtype, mode='r', offset=self.offset, shape=(count,)) \
+            if count else np.zeros(0, dtype=self.dtype)
+        self.index = self.load_index()
+
+    def __len__(self):
+        return len(self.records)
+
+    def load_index(self):
+        index_path = self.path + '.idx'
+        if os.path.exists(index_path):
+            index = np.fromfile(index_path, dtype=INDEX_DTYPE)
+            if len(index) == -(-len(self.records) // INDEX_STRIDE):
+                return index
+        # Missing or stale sidecar: sample the mapped file directly, touching one page per stride
+        picks = np.arange(0, len(self.records), INDEX_STRIDE)
+        index = np.zeros(len(picks), dtype=INDEX_DTYPE)
+        index["record"] = picks
+        index[RECEIVED] = self.records[RECEIVED][picks]
+        index["PacketCount"] = self.records["PacketCount"][picks]
+        return index
+
+    def column(self, name):
+        return self.records[name]
+
+    def index_of_time(self, timestamp):
+        # Binary search the sparse index, then only within one stride of mapped records
+        block = np.searchsorted(self.index[RECEIVED], timestamp, side='right') - 1
+        if block < 0:
+            return 0
+        start = int(self.index["record"][block])
+        end = min(start + INDEX_STRIDE, len(self.records))
+        return start + int(np.searchsorted(self.records[RECEIVED][start:end], timestamp))
+
+    def time_range(self, start_time, end_time):
+        return self.records[self.index_of_time(start_time):self.index_of_time(end_time)]
+
+    def close(self):
+        if isinstance(self.records, np.memmap):
+            self.records._mmap.close()
+
+
+def read_csv_chunks(csv_path, interval=1.0, chunk_size=4096, parser=None):
+    # Yields the rows of a taternauts.csv log as RECORD_DTYPE chunks, one buffer reused throughout
+    parser = parser or PacketParser(team_id=None)
+    chunk = np.zeros(chunk_size, dtype=RECORD_DTYPE)
+    n = 0
+    clock = MissionClock(interval)
+    with open(csv_path, 'r', newline='') as file:
+        for line in file:
+            if line.startswith('Team_Number'):
+                continue
+            packet = parser.parse(line.rstrip('\r\n'))
+            if packet is None:
+                continue
+            # CSV rows carry no arrival time, so rebuild a monotonic one from the mission clock
+            chunk[n] = (*packet, clock.advance(parse_mission_time(packet.Time), packet.PacketCount))
+            n += 1
+            if n == chunk_size:
+                yield chunk
+                n = 0
+    if n:
+        yield chunk[:n]
+
+
+def convert_csv(csv_path, log_path, interval=1.0, chunk_size=4096):
+    parser = PacketParser(team_id=None)
+    writer = BinaryLogWriter(log_path)
+    writer.open()
+    for chunk in read_csv_chunks(csv_path, interval, chunk_size, parser):
+        writer.extend(chunk)
+    writer.close()
+    return parser.packets, parser.malformed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Taternauts binary telemetry log tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+    convert = commands.add_parser('convert', help="convert a taternauts.csv log to the binary format")
+    convert.add_argument('csv')
+    convert.add_argument('log')
+    info = commands.add_parser('info', help="summarise a binary log")
+    info.add_argument('log')
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        packets, malformed = convert_csv(args.csv, args.log)
+        print(f"Converted {packets} packets ({malformed} malformed rows skipped) to {args.log}")
+    else:
+        reader = BinaryLogReader(args.log)
+        print(f"{len(reader)} records, {len(reader.index)} index entries")
+        if len(reader):
+            received = reader.column(RECEIVED)
+            print(f"Time span: {received[0]:.3f} .. {received[-1]:.3f} ({received[-1] - received[0]:.1f} s)")
+            print("Columns: " + ", ".join(reader.dtype.names))
+        reader.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
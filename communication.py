@@ -1,134 +1,143 @@
 import threading
-import serial
-import csv
+import time
+from csvLogger import CsvLogger
+from telemetryStore import TelemetryStore
+from packetSchema import HEADER, SCHEMA, PacketParser
+from frameReader import FrameReader
+from pipelineMetrics import PipelineMetrics
+from binaryLog import BinaryLogWriter
+from sequenceTracker import SequenceTracker
+from transports import open_transport
 
 
 class Communication:
 
-    def __init__(self, serial_port, baud_rate=9600, timeout=4, csv_filename='taternauts.csv'):
-        self.serial_port = serial_port
+    def __init__(self, address, baud_rate=9600, timeout=0.05, csv_filename='taternauts.csv', capacity=65536,
+                 transport_factory=open_transport, store=None, binary_log=None):
+        # A serial port name, or a transport URL such as udp://:5800 or tcp://bridge:5800 (see transports.py)
+        self.address = address
         self.baud_rate = baud_rate
         self.timeout = timeout
-        self.data_list = []
+        self.transport_factory = transport_factory
+        self.store = store if store is not None else TelemetryStore(capacity)
         self.reading = False
+        self.frame_reader = FrameReader()
+        self.parser = PacketParser()
         self.csv_filename = csv_filename
-
-        with open(self.csv_filename, mode='a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(["Team_Number", "Time", "PacketCount", "SW_STATE", "PL_STATE", "Altitude",
-                             "Temperature", "Voltage", "GYRO_R", "GYRO_P", "GYRO_Y", "Pressure", "POTATO"])
-
-    def read(self, signal_emitter):
+        # The header row is written once when the log is created; None disables the CSV log
+        self.logger = CsvLogger(csv_filename, HEADER) if csv_filename else None
+        # Optional fixed-width binary log written alongside the CSV, for fast post-flight access
+        self.binary_log = BinaryLogWriter(binary_log) if binary_log else None
+        self.metrics = PipelineMetrics()
+        # Link quality from PacketCount continuity: loss, gaps, duplicates, reordering, jitter
+        self.sequence = SequenceTracker()
+        self.parse_timer = self.metrics.timer("parse")
+
+    def read(self, signal_emitter=None):
         self.reading = True
-        with serial.Serial(self.serial_port, self.baud_rate, timeout=self.timeout) as ser:
-            print("Port opened successfully!")
-            with open(self.csv_filename, mode='a', newline='') as file:
-                writer = csv.writer(file)
+        self.frame_reader.reset()
+        self.start_logging()
+        read_timer = self.metrics.timer("serial_read")
+        try:
+            # The port timeout only paces idle polling, so stop_reading() takes effect within one poll
+            with self.transport_factory(self.address, self.baud_rate, timeout=self.timeout) as transport:
+                print(f"Opened {self.address}")
                 while self.reading:
                     try:
-                        line = ser.read_until(b'POTATO').decode('utf-8').strip()
-                        if line:
-                            print(f"Received: {line}")
-                            self.parse_csv_data(line)
-                            signal_emitter.emit_signal()
-                            writer.writerow(line.split(','))
+                        bytes_before = self.frame_reader.bytes_read
+                        started = read_timer.start()
+                        frames = self.frame_reader.read_from(transport)
+                        if frames:
+                            read_timer.stop(started)
+                            self.metrics.add("bytes_in", self.frame_reader.bytes_read - bytes_before)
+                            self.metrics.add("packets_in", len(frames))
+                            self.handle_frames(frames)
+                            if signal_emitter is not None:
+                                signal_emitter.emit_signal()
+                        elif getattr(transport, 'finished', False):
+                            # A replayed log has been delivered in full
+                            print(f"End of {self.address}")
+                            break
                     except Exception as e:
                         print(f"Error: {e}")
+        finally:
+            self.stop_logging()
+
+    def start_logging(self):
+        if self.logger is not None:
+            self.logger.start()
+
+    def stop_logging(self):
+        # Drains the queue and fsyncs the logs before the reader thread exits
+        if self.logger is not None:
+            self.logger.stop()
+        if self.binary_log is not None:
+            self.binary_log.close()
+
+    def handle_frames(self, frames):
+        for frame in frames:
+            line = self.frame_reader.decode(frame)
+            if line:
+                fields = self.parse_csv_data(line)
+                self.log_fields(fields)
+
+    def log_fields(self, fields):
+        if self.logger is not None:
+            self.logger.log(fields)
 
     def stop_reading(self):
         self.reading = False
 
     def parse_csv_data(self, data):
+        started = self.parse_timer.start()
         csv_data = data.split(',')
-        self.data_list.append(csv_data)
+        packet = self.parser.parse_fields(csv_data)
+        if packet is None:
+            self.metrics.add("parse_errors")
+        else:
+            self.store_packet(packet)
+        self.parse_timer.stop(started)
+        return csv_data
+
+    def store_packet(self, packet, received=None):
+        if received is None:
+            received = time.time()
+        self.store.append(packet, received)
+        self.sequence.update(packet.PacketCount, received)
+        if self.binary_log is not None:
+            self.binary_log.append(packet, received)
+
+    def latest_record(self):
+        # Every field from the same packet, safe to call from the GUI thread while the reader appends
+        return self.store.latest_record()
+
+    def snapshot(self, n):
+        return self.store.records(n)
+
+    def link_quality(self):
+        return self.sequence.stats()
+
+    def update_metrics(self, dropped_frames=None):
+        if dropped_frames is None:
+            dropped_frames = self.frame_reader.dropped_frames
+        self.metrics.set("dropped_frames", dropped_frames)
+        if self.logger is not None:
+            self.metrics.set("log_queue", self.logger.queued)
+            self.metrics.set("log_dropped", self.logger.dropped)
+            self.metrics.set("log_error", None if self.logger.error is None else str(self.logger.error))
+        return self.metrics.snapshot()
 
     def get_data(self):
-        return self.data_list
-
-    def getTime(self):
-        if self.data_list:
-            try:
-                return self.data_list[-1][1]
-            except (IndexError, ValueError):
-                return None
-        return None
-
-    def getPacketCount(self):
-        if self.data_list:
-            try:
-                return self.data_list[-1][2]
-            except (IndexError, ValueError):
-                return None
-        return None
-
-    def getSW_STATE(self):
-        if self.data_list:
-            try:
-                return self.data_list[-1][3]
-            except (IndexError, ValueError):
-                return None
-        return None
-
-    def getPL_STATE(self):
-        if self.data_list:
-            try:
-                return self.data_list[-1][4]
-            except (IndexError, ValueError):
-                return None
-        return None
-
-    def getAltitude(self):
-        if self.data_list:
-            try:
-                return float(self.data_list[-1][5])
-            except (IndexError, ValueError):
-                return None
-        return None
-
-    def getTemperature(self):
-        if self.data_list:
-            try:
-                return float(self.data_list[-1][6])
-            except (IndexError, ValueError):
-                return None
-        return None
-
-    def getVoltage(self):
-        if self.data_list:
-            try:
-                return float(self.data_list[-1][7])
-            except (IndexError, ValueError):
-                return None
-        return None
-
-    def getGYRO_R(self):
-        if self.data_list:
-            try:
-                return float(self.data_list[-1][8])
-            except (IndexError, ValueError):
-                return None
-        return None
-
-    def getGYRO_P(self):
-        if self.data_list:
-            try:
-                return float(self.data_list[-1][9])
-            except (IndexError, ValueError):
-                return None
-        return None
-
-    def getGYRO_Y(self):
-        if self.data_list:
-            try:
-                return float(self.data_list[-1][10])
-            except (IndexError, ValueError):
-                return None
-        return None
-
-    def getPressure(self):
-        if self.data_list:
-            try:
-                return float(self.data_list[-1][11])
-            except (IndexError, ValueError):
-                return None
-        return None
+        return self.store
+
+
+def _latest_getter(name):
+    def getter(self):
+        return self.store.latest(name)
+    getter.__name__ = f"get{name}"
+    return getter
+
+
+# getTime(), getAltitude(), ... one per schema field, each returning the latest typed value
+for _field in SCHEMA[1:]:
+    setattr(Communication, f"get{_field.name}", _latest_getter(_field.name))
@@ -0,0 +1,107 @@
+import csv
+import os
+import queue
+import threading
+import time
+
+
+class CsvLogger:
+
+    def __init__(self, csv_filename, header=None, max_queue=10000, batch_size=256, flush_interval=1.0):
+        self.csv_filename = csv_filename
+        self.header = header
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.thread = None
+        self.written = 0
+        self.dropped = 0
+        self.error = None
+
+    @property
+    def queued(self):
+        return self.queue.qsize()
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.thread = threading.Thread(target=self.run, name="CsvLogger", daemon=True)
+        self.thread.start()
+
+    def log(self, fields):
+        # Never block the serial thread: a full queue means the disk is behind, so count and drop
+        if self.error is not None:
+            self.dropped += 1
+            return
+        try:
+            self.queue.put_nowait(fields)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop(self, timeout=5.0):
+        if self.thread is None:
+            return
+        if self.thread.is_alive():
+            try:
+                self.queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            self.thread.join(timeout)
+        # A writer that died leaves its backlog behind; nothing will ever write it
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item:
+                self.dropped += 1
+        self.thread = None
+
+    def run(self):
+        try:
+            self.write_rows()
+        except (OSError, csv.Error) as e:
+            # A locked file (Excel on Windows) or a full disk stops logging, not the ground station
+            self.error = e
+            print(f"CSV logging to {self.csv_filename} stopped: {e}")
+
+    def write_rows(self):
+        with open(self.csv_filename, mode='a', newline='') as file:
+            writer = csv.writer(file)
+            # Only a new file gets the header, so restarts keep appending to one table
+            if self.header and file.tell() == 0:
+                writer.writerow(self.header)
+            batch = []
+            last_flush = time.monotonic()
+            running = True
+            while running:
+                try:
+                    item = self.queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    running = False
+                elif item:
+                    batch.append(item)
+                    # Pull everything already waiting so the file sees one write per batch
+                    while len(batch) < self.batch_size:
+                        try:
+                            item = self.queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if item is None:
+                            running = False
+                            break
+                        batch.append(item)
+
+                if batch:
+                    writer.writerows(batch)
+                    self.written += len(batch)
+                    batch.clear()
+
+                now = time.monotonic()
+                if not running or now - last_flush >= self.flush_interval:
+                    file.flush()
+                    last_flush = now
+
+            os.fsync(file.fileno())
@@ -0,0 +1,103 @@
+import numpy as np
+from ringBuffer import RingBuffer
+
+
+class _Level:
+
+    def __init__(self, capacity, series):
+        self.series = series
+        # Bucket start time in timestamps; rows are bucket end time, per-series mins, per-series maxs
+        self.buffer = RingBuffer(capacity, 1 + 2 * series)
+        self.clear_pending()
+
+    def clear_pending(self):
+        self.pending = (np.empty(0), np.empty(0), np.empty((self.series, 0)), np.empty((self.series, 0)))
+
+    def push(self, children, factor):
+        t0, t1, mins, maxs = [np.concatenate((old, new), axis=-1) for old, new in zip(self.pending, children)]
+        buckets = len(t0) // factor
+        used = buckets * factor
+        self.pending = (t0[used:], t1[used:], mins[:, used:], maxs[:, used:])
+        if buckets == 0:
+            return None
+
+        # fmin/fmax ignore NaN gaps unless a whole bucket is missing
+        bucket_t0 = t0[:used:factor]
+        bucket_t1 = t1[factor - 1:used:factor]
+        bucket_mins = np.fmin.reduce(mins[:, :used].reshape(self.series, buckets, factor), axis=2)
+        bucket_maxs = np.fmax.reduce(maxs[:, :used].reshape(self.series, buckets, factor), axis=2)
+        self.buffer.extend(bucket_t0, bucket_t1, *bucket_mins, *bucket_maxs)
+        return bucket_t0, bucket_t1, bucket_mins, bucket_maxs
+
+    def clear(self):
+        self.buffer.clear()
+        self.clear_pending()
+
+
+class MinMaxPyramid:
+
+    def __init__(self, capacity, series=1, factor=4, min_buckets=64):
+        self.series = series
+        self.factor = factor
+        self.raw = RingBuffer(capacity, series)
+        self.levels = []
+        bucket_size = factor
+        while capacity // bucket_size >= min_buckets:
+            self.levels.append(_Level(-(-capacity // bucket_size), series))
+            bucket_size *= factor
+
+    def __len__(self):
+        return len(self.raw)
+
+    @property
+    def count(self):
+        return self.raw.count
+
+    def extend(self, timestamps, *series):
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(series, dtype=np.float64).reshape(self.series, len(timestamps))
+        self.raw.extend(timestamps, *values)
+
+        # Each level only sees the buckets the level below just completed, so the
+        # pyramid stays current at a cost proportional to the batch, not the history
+        children = (timestamps, timestamps, values, values)
+        for level in self.levels:
+            children = level.push(children, self.factor)
+            if children is None:
+                break
+
+    def window(self, max_points=None):
+        if max_points is None or len(self.raw) <= 2 * max_points:
+            return self.raw.window()
+
+        bucket_size = self.factor
+        for level in self.levels:
+            covered = level.buffer.count * bucket_size
+            tail = self.raw.count - covered
+            if len(level.buffer) + tail // 2 <= max_points or level is self.levels[-1]:
+                break
+            bucket_size *= self.factor
+        else:
+            return self.raw.window()
+
+        bucket_t0, rows = level.buffer.window()
+        raw_t, raw_values = self.raw.window()
+        tail = min(tail, len(raw_t))
+        buckets = len(bucket_t0)
+
+        # Each bucket becomes a (start, min) -> (end, max) pair so spikes survive decimation;
+        # samples not yet rolled into a full bucket are appended raw
+        timestamps = np.empty(2 * buckets + tail)
+        timestamps[0:2 * buckets:2] = bucket_t0
+        timestamps[1:2 * buckets:2] = rows[0]
+        timestamps[2 * buckets:] = raw_t[len(raw_t) - tail:]
+        values = np.empty((self.series, 2 * buckets + tail))
+        values[:, 0:2 * buckets:2] = rows[1:1 + self.series]
+        values[:, 1:2 * buckets:2] = rows[1 + self.series:]
+        values[:, 2 * buckets:] = raw_values[:, raw_values.shape[1] - tail:]
+        return timestamps, values
+
+    def clear(self):
+        self.raw.clear()
+        for level in self.levels:
+            level.clear()
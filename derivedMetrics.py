@@ -0,0 +1,216 @@
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from replaySerial import MissionClock
+from ringBuffer import RingBuffer
+
+SEA_LEVEL_HPA = 1013.25
+
+
+def pressure_altitude(pressure, reference=SEA_LEVEL_HPA):
+    # International barometric formula, hPa in, metres out
+    return 44330.0 * (1.0 - np.power(np.asarray(pressure, dtype=np.float64) / reference, 1.0 / 5.255))
+
+
+class EMA:
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self.value = None
+        # Longest run we can solve in closed form before (1 - alpha)^-k overflows a float64
+        decay = -math.log10(1.0 - alpha) if alpha < 1 else 0
+        self.chunk = max(1, min(4096, int(150 / decay))) if decay else 4096
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        out = np.empty_like(values)
+        for start in range(0, len(values), self.chunk):
+            out[start:start + self.chunk] = self._update_chunk(values[start:start + self.chunk])
+        return out
+
+    def _update_chunk(self, values):
+        if self.value is None:
+            self.value = values[0]
+        # y_k = (1-a)^(k+1) y_-1 + a * sum_j (1-a)^(k-j) x_j, evaluated with one cumsum
+        decay = 1.0 - self.alpha
+        powers = decay ** np.arange(1, len(values) + 1)
+        out = powers * (self.value + self.alpha * np.cumsum(values / powers))
+        self.value = out[-1]
+        return out
+
+
+class VerticalSpeed:
+
+    def __init__(self):
+        self.last_time = None
+        self.last_altitude = None
+
+    def update(self, altitude, timestamps):
+        # timestamps are mission seconds: packets delivered in one read arrive microseconds apart
+        if len(altitude) == 0:
+            return np.empty(0)
+        previous_altitude = self.last_altitude if self.last_altitude is not None else altitude[0]
+        previous_time = self.last_time if self.last_time is not None else timestamps[0]
+        dt = np.diff(timestamps, prepend=previous_time)
+        dh = np.diff(altitude, prepend=previous_altitude)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            speed = np.where(dt > 0, dh / dt, np.nan)
+        self.last_time = timestamps[-1]
+        self.last_altitude = altitude[-1]
+        return speed
+
+
+class AltitudeKalman:
+
+    def __init__(self, process_noise=4.0, measurement_noise=2.0):
+        self.q = process_noise
+        self.r = measurement_noise ** 2
+        self.state = None
+        self.p = None
+        self.last_time = None
+
+    def update(self, altitude, timestamps):
+        # Constant-velocity model: state is (altitude, vertical speed)
+        n = len(altitude)
+        altitudes = np.empty(n)
+        speeds = np.empty(n)
+        if n == 0:
+            return altitudes, speeds
+        first = self.state is None
+        if first:
+            z = float(altitude[0])
+            self.state = [z if z == z else 0.0, 0.0]
+            self.p = [[self.r, 0.0], [0.0, 100.0]]
+            self.last_time = float(timestamps[0])
+        # Plain locals inside the loop: this runs once per packet, and over the whole history on resume
+        h, v = self.state
+        (p00, p01), (p10, p11) = self.p
+        q, r, last_time = self.q, self.r, self.last_time
+        for i, (z, t) in enumerate(zip(altitude.tolist(), timestamps.tolist())):
+            if i or not first:
+                dt = max(t - last_time, 1e-3)
+                last_time = t
+                h += v * dt
+                dt2 = dt * dt
+                p00 += dt * (p10 + p01 + dt * p11) + q * dt2 * dt2 / 4
+                p01 += dt * p11 + q * dt2 * dt / 2
+                p10 += dt * p11 + q * dt2 * dt / 2
+                p11 += q * dt2
+                if z == z:
+                    s = p00 + r
+                    k0, k1 = p00 / s, p10 / s
+                    residual = z - h
+                    h += k0 * residual
+                    v += k1 * residual
+                    p00, p01, p10, p11 = (1 - k0) * p00, (1 - k0) * p01, p10 - k1 * p00, p11 - k1 * p01
+            altitudes[i] = h
+            speeds[i] = v
+        self.state = [h, v]
+        self.p = [[p00, p01], [p10, p11]]
+        self.last_time = last_time
+        return altitudes, speeds
+
+
+class RollingStats:
+
+    def __init__(self, window):
+        self.window = window
+        self.history = np.empty(0)
+        self.latest = {"mean": None, "std": None, "min": None, "max": None}
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return {name: np.empty(0) for name in self.latest}
+
+        # Mean and stddev for every sample of the batch from one cumsum over the carried-over tail
+        series = np.concatenate((self.history, values))
+        sums = np.concatenate(([0.0], np.cumsum(series)))
+        squares = np.concatenate(([0.0], np.cumsum(series * series)))
+        ends = np.arange(len(self.history) + 1, len(series) + 1)
+        starts = np.maximum(ends - self.window, 0)
+        counts = ends - starts
+        mean = (sums[ends] - sums[starts]) / counts
+        variance = np.maximum((squares[ends] - squares[starts]) / counts - mean * mean, 0.0)
+        self.history = series[-(self.window - 1):] if self.window > 1 else np.empty(0)
+
+        # Min/max over every window at once, padding the front so early windows only see real samples
+        pad = self.window - len(series) + len(values) - 1
+        minimum = sliding_window_view(np.concatenate((np.full(pad, np.inf), series)), self.window).min(axis=1)
+        maximum = sliding_window_view(np.concatenate((np.full(pad, -np.inf), series)), self.window).max(axis=1)
+        result = {"mean": mean, "std": np.sqrt(variance), "min": minimum, "max": maximum}
+        self.latest = {name: float(series_[-1]) for name, series_ in result.items()}
+        return result
+
+
+class DerivedMetrics:
+
+    def __init__(self, window=30, ema_alpha=0.2, history=4096, ground_pressure=None, interval=1.0):
+        self.title = "Derived"
+        self.ground_pressure = ground_pressure
+        # Rates are differentiated against the vehicle's clock; arrival times bunch up per serial read
+        self.clock = MissionClock(interval)
+        self.vertical_speed = VerticalSpeed()
+        self.last_speed = 0.0
+        self.speed_ema = EMA(ema_alpha)
+        self.altitude_ema = EMA(ema_alpha)
+        self.kalman = AltitudeKalman()
+        self.rolling = {"Altitude": RollingStats(window), "Voltage": RollingStats(window)}
+        self.outputs = {}
+        self.graphs = []
+        # Recent derived samples, so later consumers can read windows without recomputing
+        self.names = ["vertical_speed", "vertical_speed_ema", "altitude_ema", "kalman_altitude",
+                      "kalman_speed", "pressure_altitude"]
+        self.buffer = RingBuffer(history, len(self.names))
+
+    def add_graph(self, graph, *outputs):
+        self.graphs.append((graph, outputs))
+
+    def update_batch(self, altitude, pressure, voltage, mission_time, packet_count, timestamps):
+        if len(timestamps) == 0:
+            return
+        # Zero the barometric reference at the pad unless one was given
+        if self.ground_pressure is None:
+            finite = pressure[np.isfinite(pressure)]
+            if len(finite):
+                self.ground_pressure = float(finite[0])
+        elapsed = np.asarray(self.clock.advance_all(mission_time, packet_count), dtype=np.float64)
+        speed = self.vertical_speed.update(altitude, elapsed)
+        kalman_altitude, kalman_speed = self.kalman.update(altitude, elapsed)
+        outputs = {
+            "vertical_speed": speed,
+            "vertical_speed_ema": self.speed_ema.update(self.hold_last(speed)),
+            "altitude_ema": self.altitude_ema.update(altitude),
+            "kalman_altitude": kalman_altitude,
+            "kalman_speed": kalman_speed,
+            "pressure_altitude": pressure_altitude(pressure, self.ground_pressure or SEA_LEVEL_HPA),
+        }
+        for name, stats in zip(("Altitude", "Voltage"), (altitude, voltage)):
+            for stat, values in self.rolling[name].update(stats).items():
+                outputs[f"{name}_{stat}"] = values
+        self.outputs = outputs
+        self.buffer.extend(timestamps, *[outputs[name] for name in self.names])
+
+        for graph, names in self.graphs:
+            graph.update_batch(*[outputs[name] for name in names], timestamps)
+
+    def hold_last(self, speed):
+        # Samples without a rate (no altitude, or no clock step) repeat the last one instead of pulling the EMA to 0
+        finite = np.isfinite(speed)
+        if finite.all():
+            self.last_speed = float(speed[-1])
+            return speed
+        index = np.maximum.accumulate(np.where(finite, np.arange(len(speed)), -1))
+        filled = np.where(index >= 0, speed[np.maximum(index, 0)], self.last_speed)
+        self.last_speed = float(filled[-1])
+        return filled
+
+    def update_gui(self):
+        for graph, names in self.graphs:
+            graph.update_gui()
+
+    def latest(self, name):
+        values = self.outputs.get(name)
+        if values is None or len(values) == 0:
+            return None
+        return float(values[-1])
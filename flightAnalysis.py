@@ -0,0 +1,267 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+from binaryLog import MAGIC, BinaryLogReader, read_csv_chunks
+from derivedMetrics import EMA, VerticalSpeed
+from packetSchema import as_text
+from replaySerial import MissionClock
+
+CACHE_VERSION = 4
+# Altitude bin width for the descent-rate profile, in metres
+PROFILE_BIN = 25.0
+
+
+def is_binary_log(path):
+    with open(path, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def iter_chunks(path, chunk_size=65536):
+    # Binary logs are memory-mapped and sliced; CSV logs are parsed one chunk at a time
+    if is_binary_log(path):
+        reader = BinaryLogReader(path)
+        try:
+            for start in range(0, len(reader), chunk_size):
+                yield reader.records[start:start + chunk_size]
+        finally:
+            reader.close()
+    else:
+        yield from read_csv_chunks(path, chunk_size=chunk_size)
+
+
+def log_hash(path, block_size=1 << 20):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FlightSummary:
+
+    def __init__(self, ema_alpha=0.3, interval=1.0):
+        # Rates and durations follow the vehicle's clock; a log's arrival times can be bunched by burst
+        # delivery or by a replay recorded at full speed
+        self.clock = MissionClock(interval)
+        self.packets = 0
+        self.first_time = None
+        self.last_time = None
+        self.max_altitude = -np.inf
+        self.apogee_time = None
+        self.apogee_mission_time = None
+        self.altitude_ema = EMA(ema_alpha)
+        self.vertical_speed = VerticalSpeed()
+        self.max_descent_rate = 0.0
+        self.profile_sums = np.zeros(0)
+        self.profile_counts = np.zeros(0, dtype=np.int64)
+        self.first_voltage = None
+        self.min_voltage = np.inf
+        self.min_voltage_time = None
+        self.last_voltage = None
+        self.gyro = {axis: {"sum": 0.0, "squares": 0.0, "max_abs": 0.0, "count": 0}
+                     for axis in ("GYRO_R", "GYRO_P", "GYRO_Y")}
+        self.phases = {}
+        self.phase_order = []
+        self.last_state = None
+
+    def update(self, records):
+        if len(records) == 0:
+            return
+        timestamps = np.asarray(self.clock.advance_all(records["Time"], records["PacketCount"]), dtype=np.float64)
+        if self.first_time is None:
+            self.first_time = float(timestamps[0])
+        self.packets += len(records)
+
+        altitude = np.asarray(records["Altitude"], dtype=np.float64)
+        finite = np.isfinite(altitude)
+        if finite.any():
+            peak = int(np.nanargmax(np.where(finite, altitude, -np.inf)))
+            if altitude[peak] > self.max_altitude:
+                self.max_altitude = float(altitude[peak])
+                self.apogee_time = float(timestamps[peak])
+                self.apogee_mission_time = as_text(records["Time"][peak])
+
+        # Descent rate from smoothed altitude, binned by altitude so chunks merge by addition
+        smoothed = self.altitude_ema.update(altitude[finite]) if finite.any() else np.empty(0)
+        speed = self.vertical_speed.update(smoothed, timestamps[finite])
+        descending = np.isfinite(speed) & (speed < 0)
+        if descending.any():
+            self.max_descent_rate = max(self.max_descent_rate, float(-speed[descending].min()))
+            bins = np.maximum(smoothed[descending] // PROFILE_BIN, 0).astype(np.int64)
+            size = max(len(self.profile_counts), int(bins.max()) + 1)
+            self.profile_sums = np.pad(self.profile_sums, (0, size - len(self.profile_sums)))
+            self.profile_counts = np.pad(self.profile_counts, (0, size - len(self.profile_counts)))
+            self.profile_sums += np.bincount(bins, weights=-speed[descending], minlength=size)
+            self.profile_counts += np.bincount(bins, minlength=size)
+
+        voltage = np.asarray(records["Voltage"], dtype=np.float64)
+        valid = np.isfinite(voltage)
+        if valid.any():
+            if self.first_voltage is None:
+                self.first_voltage = float(voltage[valid][0])
+            low = int(np.nanargmin(np.where(valid, voltage, np.inf)))
+            if voltage[low] < self.min_voltage:
+                self.min_voltage = float(voltage[low])
+                self.min_voltage_time = float(timestamps[low])
+            self.last_voltage = float(voltage[valid][-1])
+
+        for axis, stats in self.gyro.items():
+            rates = np.asarray(records[axis], dtype=np.float64)
+            rates = rates[np.isfinite(rates)]
+            if len(rates):
+                stats["sum"] += float(rates.sum())
+                stats["squares"] += float(np.dot(rates, rates))
+                stats["max_abs"] = max(stats["max_abs"], float(np.abs(rates).max()))
+                stats["count"] += len(rates)
+
+        # Each sample's state holds until the next sample, including across chunk boundaries
+        states = np.asarray(records["SW_STATE"])
+        if self.last_state is not None:
+            self.add_phase(self.last_state, timestamps[0] - self.last_time)
+        names, first = np.unique(states, return_index=True)
+        for name in names[np.argsort(first)].tolist():
+            self.add_phase(as_text(name), 0.0)
+        names, inverse = np.unique(states[:-1], return_inverse=True)
+        totals = np.bincount(inverse, weights=np.diff(timestamps), minlength=len(names))
+        for name, total in zip(names.tolist(), totals):
+            self.add_phase(as_text(name), total)
+        self.last_state = as_text(states[-1])
+        self.last_time = float(timestamps[-1])
+
+    def add_phase(self, name, duration):
+        if name not in self.phases:
+            self.phases[name] = 0.0
+            self.phase_order.append(name)
+        self.phases[name] += float(max(duration, 0.0))
+
+    def result(self):
+        if self.packets == 0:
+            return {"packets": 0}
+        gyro = {}
+        for axis, stats in self.gyro.items():
+            if stats["count"]:
+                mean = stats["sum"] / stats["count"]
+                std = max(stats["squares"] / stats["count"] - mean * mean, 0.0) ** 0.5
+                gyro[axis] = {"mean": mean, "std": std, "max_abs": stats["max_abs"]}
+        with np.errstate(invalid='ignore'):
+            profile = self.profile_sums / self.profile_counts
+        return {
+            "packets": self.packets,
+            "duration": self.last_time - self.first_time,
+            "max_altitude": self.max_altitude if np.isfinite(self.max_altitude) else None,
+            "apogee_time": None if self.apogee_time is None else self.apogee_time - self.first_time,
+            "apogee_mission_time": self.apogee_mission_time,
+            "max_descent_rate": self.max_descent_rate,
+            "descent_profile": [[i * PROFILE_BIN, float(rate)] for i, rate in enumerate(profile)
+                                if self.profile_counts[i]],
+            "voltage": None if self.first_voltage is None else {
+                "start": self.first_voltage, "min": self.min_voltage, "end": self.last_voltage,
+                "sag": self.first_voltage - self.min_voltage,
+                "min_time": self.min_voltage_time - self.first_time},
+            "gyro": gyro,
+            "phases": [[name, self.phases[name]] for name in self.phase_order],
+        }
+
+
+def analyse(path, chunk_size=65536, use_cache=True):
+    # Aggregates are cached next to the log, keyed by its content hash
+    cache_path = path + '.summary.json'
+    digest = log_hash(path)
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r') as file:
+                cached = json.load(file)
+            if cached.get("hash") == digest and cached.get("version") == CACHE_VERSION:
+                return cached["summary"]
+        except (OSError, ValueError):
+            pass
+
+    summary = FlightSummary()
+    for chunk in iter_chunks(path, chunk_size):
+        summary.update(chunk)
+    result = summary.result()
+    if use_cache:
+        try:
+            with open(cache_path, 'w') as file:
+                json.dump({"version": CACHE_VERSION, "hash": digest, "summary": result}, file)
+        except OSError as e:
+            print(f"Could not write analysis cache {cache_path}: {e}")
+    return result
+
+
+def format_summary(summary):
+    if summary["packets"] == 0:
+        return "No packets in log"
+    lines = [f"Packets: {summary['packets']} over {summary['duration']:.1f} s"]
+    if summary["max_altitude"] is not None:
+        lines.append(f"Apogee: {summary['max_altitude']:.1f} m at {summary['apogee_time']:.1f} s "
+                     f"(mission time {summary['apogee_mission_time']})")
+    lines.append(f"Max descent rate: {summary['max_descent_rate']:.1f} m/s")
+    for altitude, rate in summary["descent_profile"][::-1][:10]:
+        lines.append(f"  {altitude:7.0f} m  {rate:6.1f} m/s")
+    voltage = summary["voltage"]
+    if voltage:
+        lines.append(f"Voltage: {voltage['start']:.2f} V -> {voltage['end']:.2f} V, "
+                     f"min {voltage['min']:.2f} V at {voltage['min_time']:.1f} s (sag {voltage['sag']:.2f} V)")
+    for axis, stats in summary["gyro"].items():
+        lines.append(f"{axis}: mean {stats['mean']:.2f}, std {stats['std']:.2f}, max |{stats['max_abs']:.2f}|")
+    lines.append("Phases: " + ", ".join(f"{name or '?'} {duration:.1f} s" for name, duration in summary["phases"]))
+    return "\n".join(lines)
+
+
+def plot_log(path, output_dir, chunk_size=65536, width=1200, height=400):
+    # Static PNGs drawn through the live graph classes, so debrief plots match the ground station
+    from PyQt5.QtWidgets import QApplication
+    import pyqtgraph.exporters
+    from altitudeGraph import AltitudeGraph
+    from pressureGraph import PressureGraph
+    from rotationGraph import RotationGraph
+    from temperatureGraph import TemperatureGraph
+    from voltageGraph import VoltageGraph
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    graphs = [(AltitudeGraph, ("Altitude",)), (TemperatureGraph, ("Temperature",)),
+              (PressureGraph, ("Pressure",)), (VoltageGraph, ("Voltage",)),
+              (RotationGraph, ("GYRO_R", "GYRO_P", "GYRO_Y"))]
+    graphs = [(graph_class(window=1 << 20), fields) for graph_class, fields in graphs]
+    clock = MissionClock()
+    for chunk in iter_chunks(path, chunk_size):
+        timestamps = np.asarray(clock.advance_all(chunk["Time"], chunk["PacketCount"]), dtype=np.float64)
+        for graph, fields in graphs:
+            graph.update_batch(*[chunk[field] for field in fields], timestamps)
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for graph, fields in graphs:
+        graph.win.resize(width, height)
+        app.processEvents()
+        graph.draw(width)
+        graph.plot.enableAutoRange()
+        image_path = os.path.join(output_dir, f"{graph.title.lower().replace(' ', '_')}.png")
+        exporter = pyqtgraph.exporters.ImageExporter(graph.plot)
+        exporter.parameters()['width'] = width
+        exporter.export(image_path)
+        written.append(image_path)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Post-flight summary of a Taternauts CSV or binary log")
+    parser.add_argument('log')
+    parser.add_argument('--plots', metavar='DIR', help="also write static PNG plots to DIR")
+    parser.add_argument('--json', action='store_true', help="print the summary as JSON")
+    parser.add_argument('--no-cache', action='store_true', help="recompute even if a cached summary exists")
+    args = parser.parse_args()
+
+    summary = analyse(args.log, use_cache=not args.no_cache)
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+    if args.plots:
+        for image_path in plot_log(args.log, args.plots):
+            print(f"Wrote {image_path}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+DELIMITER = b'POTATO'
+WHITESPACE = b' \t\r\n'
+
+
+class FrameReader:
+
+    def __init__(self, delimiter=DELIMITER, max_frame_size=512):
+        self.delimiter = delimiter
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+        self.bytes_read = 0
+        self.frames = 0
+        self.dropped_frames = 0
+
+    def feed(self, data):
+        self.bytes_read += len(data)
+        if self.buffer:
+            # Finish the frame left over from the last read; the old buffer is handed to
+            # split_frames whole and never touched again, so frames can stay views into it
+            self.buffer += data
+            data = self.buffer
+            self.buffer = bytearray()
+        return self.split_frames(data)
+
+    def read_from(self, transport):
+        data = transport.read_chunk()
+        if not data:
+            return []
+        return self.feed(data)
+
+    def split_frames(self, data):
+        # Frames are memoryview slices of the chunk they arrived in: no copy until a consumer decodes
+        frames = []
+        view = memoryview(data)
+        start = 0
+        while True:
+            end = data.find(self.delimiter, start)
+            if end < 0:
+                break
+            end += len(self.delimiter)
+            # Skip the line break the vehicle sends between frames
+            while start < end and data[start] in WHITESPACE:
+                start += 1
+            frame = view[start:end]
+            start = end
+            if len(frame) > self.max_frame_size or len(frame) == len(self.delimiter):
+                self.dropped_frames += 1
+                continue
+            frames.append(frame)
+
+        # A missing delimiter on an oversized tail means we are mid-garbage; keep only
+        # enough bytes to still match a delimiter that straddles the next read
+        if len(data) - start > self.max_frame_size:
+            self.dropped_frames += 1
+            start = len(data) - (len(self.delimiter) - 1)
+        self.buffer += view[start:]
+        self.frames += len(frames)
+        return frames
+
+    def decode(self, frame):
+        try:
+            return str(frame, 'utf-8')
+        except UnicodeDecodeError:
+            self.dropped_frames += 1
+            return None
+
+    def reset(self):
+        self.buffer.clear()
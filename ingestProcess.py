@@ -0,0 +1,146 @@
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from telemetryStore import RECORD_DTYPE, RECEIVED
+
+
+HEADER_BYTES = 16
+
+
+class SharedRing:
+
+    def __init__(self, capacity=None, name=None):
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=HEADER_BYTES + capacity * RECORD_DTYPE.itemsize)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        # Header: [records written so far, capacity]; records follow as fixed-width structs
+        self.header = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf)
+        if capacity is not None:
+            self.header[:] = (0, capacity)
+        self.capacity = int(self.header[1])
+        self.records = np.ndarray((self.capacity,), dtype=RECORD_DTYPE, buffer=self.shm.buf, offset=HEADER_BYTES)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def count(self):
+        return int(self.header[0])
+
+    def append(self, values, received=None):
+        count = int(self.header[0])
+        self.records[count % self.capacity] = (*values, time.time() if received is None else received)
+        # Publish only after the record is fully written
+        self.header[0] = count + 1
+
+    def read_since(self, start):
+        count = self.count
+        # Slot count % capacity is the one the writer fills next, so the oldest readable record is one newer
+        start = max(start, count - self.capacity + 1)
+        if start >= count:
+            return np.empty(0, dtype=RECORD_DTYPE), count
+        first, last = start % self.capacity, count % self.capacity
+        if first < last:
+            records = self.records[first:last].copy()
+        else:
+            records = np.concatenate((self.records[first:], self.records[:last]))
+        # The writer may have lapped us while copying; anything older than one ring behind is suspect
+        overwritten = self.count - self.capacity + 1 - start
+        if overwritten > 0:
+            records = records[overwritten:]
+        return records, count
+
+    def close(self):
+        del self.header, self.records
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def ingest_worker(ring_name, comm_kwargs, conn, stop_event, status_interval=1.0):
+    from communication import Communication
+
+    ring = SharedRing(name=ring_name)
+    comm = Communication(store=ring, **comm_kwargs)
+    reader = threading.Thread(target=comm.read)
+    reader.start()
+    try:
+        while not stop_event.wait(status_interval):
+            conn.send(comm.update_metrics())
+            if not reader.is_alive():
+                break
+    finally:
+        comm.stop_reading()
+        reader.join()
+        conn.send(comm.update_metrics())
+        conn.close()
+        ring.close()
+
+
+class IngestProcess:
+
+    def __init__(self, comm, capacity=65536):
+        self.comm = comm
+        self.capacity = capacity
+        self.ring = None
+        self.process = None
+        self.conn = None
+        self.stop_event = None
+        self.read_count = 0
+        self.lost = 0
+
+    def start(self):
+        if self.process is not None:
+            return
+        self.ring = SharedRing(self.capacity)
+        self.read_count = 0
+        context = multiprocessing.get_context()
+        self.conn, child_conn = context.Pipe(duplex=False)
+        self.stop_event = context.Event()
+        comm_kwargs = {"address": self.comm.address, "baud_rate": self.comm.baud_rate,
+                       "timeout": self.comm.timeout, "csv_filename": self.comm.csv_filename,
+                       "transport_factory": self.comm.transport_factory,
+                       "binary_log": self.comm.binary_log.path if self.comm.binary_log else None}
+        self.process = context.Process(target=ingest_worker, name="TaternautsIngest", daemon=True,
+                                       args=(self.ring.name, comm_kwargs, child_conn, self.stop_event))
+        self.process.start()
+        child_conn.close()
+
+    def pump(self):
+        if self.ring is None:
+            return 0
+        records, count = self.ring.read_since(self.read_count)
+        self.lost += count - self.read_count - len(records)
+        self.read_count = count
+        if len(records):
+            self.comm.store.extend(records)
+            self.comm.sequence.update_batch(records["PacketCount"], records[RECEIVED])
+
+        # Worker counters arrive about once a second over the pipe
+        while self.conn is not None and self.conn.poll():
+            try:
+                snapshot = self.conn.recv()
+            except EOFError:
+                self.conn = None
+                break
+            self.comm.metrics.counters.update(snapshot["counters"])
+            self.comm.metrics.gauges.update(snapshot["gauges"])
+        self.comm.metrics.set("ipc_lost", self.lost)
+        return len(records)
+
+    def stop(self):
+        if self.process is None:
+            return
+        self.stop_event.set()
+        self.process.join()
+        self.pump()
+        self.process = None
+        self.conn = None
+        self.ring.close()
+        self.ring = None
@@ -0,0 +1,197 @@
+import heapq
+import itertools
+import selectors
+import time
+import serial
+from frameReader import FrameReader
+from packetSchema import PacketParser, TEAM_ID
+from transports import open_transport
+
+
+class Link:
+
+    def __init__(self, name, address, baud_rate=9600, transport_factory=open_transport):
+        self.name = name
+        self.address = address
+        self.baud_rate = baud_rate
+        self.transport_factory = transport_factory
+        self.frame_reader = FrameReader()
+        self.parser = PacketParser(team_id=None)
+        self.port = None
+        self.frames = 0
+        self.first = 0  # packets this link delivered before any other link
+        self.duplicates = 0
+        self.error = None
+        self.retry_at = 0.0
+
+    def open(self):
+        # timeout=0 makes every read non-blocking; the manager does the waiting for all links at once
+        self.port = self.transport_factory(self.address, self.baud_rate, timeout=0)
+        self.frame_reader.reset()
+        self.error = None
+        return self.port
+
+    def fileno(self):
+        try:
+            return self.port.fileno()
+        except (AttributeError, OSError, ValueError, serial.SerialException):
+            return None
+
+    def close(self):
+        if self.port is None:
+            return
+        try:
+            self.port.close()
+        except (OSError, serial.SerialException):
+            pass
+        self.port = None
+
+    def stats(self):
+        return {"frames": self.frames, "bytes": self.frame_reader.bytes_read, "first": self.first,
+                "duplicates": self.duplicates,
+                "dropped": self.frame_reader.dropped_frames, "malformed": self.parser.malformed,
+                "error": self.error}
+
+
+class LinkManager:
+
+    def __init__(self, comm, links, team_ids=(TEAM_ID,), reorder_delay=0.25, dedup_ttl=10.0, poll_interval=0.02,
+                 reopen_interval=5.0):
+        self.comm = comm
+        self.links = links
+        self.team_ids = set(team_ids) if team_ids else None
+        self.reorder_delay = reorder_delay
+        self.dedup_ttl = dedup_ttl
+        self.poll_interval = poll_interval
+        self.reopen_interval = reopen_interval
+        self.reading = False
+        self.selector = None
+        self.selectable = True
+        self.seen = {}  # (Team_Number, PacketCount) -> arrival, oldest first
+        self.pending = []
+        self.sequence = itertools.count()
+
+    def read(self):
+        self.reading = True
+        self.comm.start_logging()
+        self.selector = selectors.DefaultSelector()
+        self.selectable = True
+        try:
+            for link in self.links:
+                self.open_link(link)
+            print(f"Reading {sum(link.port is not None for link in self.links)} link(s)")
+
+            while self.reading:
+                received = False
+                now = time.monotonic()
+                for link in self.links:
+                    if link.port is not None:
+                        received |= self.poll_link(link)
+                    elif now >= link.retry_at:
+                        self.open_link(link)
+                self.release(time.monotonic())
+                if not received:
+                    # Sleep in select() over every port fd when we can; ports without one are polled
+                    if self.selectable and self.selector.get_map():
+                        self.selector.select(self.poll_interval)
+                    else:
+                        time.sleep(self.poll_interval)
+        finally:
+            self.release(time.monotonic(), flush=True)
+            for link in self.links:
+                self.close_link(link)
+            self.selector.close()
+            self.comm.stop_logging()
+
+    def open_link(self, link):
+        try:
+            link.open()
+        except (OSError, serial.SerialException) as e:
+            self.fail_link(link, f"Error opening {link.name}: {e}")
+            return
+        if link.retry_at:
+            print(f"Reopened {link.name}")
+        fd = link.fileno()
+        if fd is None:
+            self.selectable = False
+        else:
+            self.selector.register(fd, selectors.EVENT_READ, link)
+
+    def close_link(self, link):
+        fd = link.fileno()
+        if fd is not None:
+            try:
+                self.selector.unregister(fd)
+            except (KeyError, ValueError):
+                pass
+        link.close()
+
+    def fail_link(self, link, message):
+        # A dead port left in the selector would stay readable forever; drop it and retry later
+        print(message)
+        self.close_link(link)
+        link.error = message
+        link.retry_at = time.monotonic() + self.reopen_interval
+
+    def poll_link(self, link):
+        bytes_before = link.frame_reader.bytes_read
+        try:
+            frames = link.frame_reader.read_from(link.port)
+        except (OSError, serial.SerialException) as e:
+            # One failed radio must not take the others down with it
+            self.fail_link(link, f"Error on {link.name}: {e}")
+            return False
+        if link.frame_reader.bytes_read != bytes_before:
+            self.comm.metrics.add("bytes_in", link.frame_reader.bytes_read - bytes_before)
+        if not frames:
+            return False
+
+        now = time.monotonic()
+        received = time.time()
+        link.frames += len(frames)
+        self.comm.metrics.add("packets_in", len(frames))
+        for frame in frames:
+            line = link.frame_reader.decode(frame)
+            if not line:
+                continue
+            fields = line.split(',')
+            packet = link.parser.parse_fields(fields)
+            if packet is None or (self.team_ids is not None and packet.Team_Number not in self.team_ids):
+                self.comm.metrics.add("parse_errors")
+                continue
+            self.accept(link, packet, fields, now, received)
+        return True
+
+    def accept(self, link, packet, fields, now, received):
+        # Forget keys after dedup_ttl so a rebooted vehicle restarting its PacketCount is not dropped
+        while self.seen:
+            oldest = next(iter(self.seen))
+            if now - self.seen[oldest] < self.dedup_ttl:
+                break
+            del self.seen[oldest]
+
+        key = (packet.Team_Number, packet.PacketCount)
+        if key in self.seen:
+            link.duplicates += 1
+            self.comm.metrics.add("duplicates")
+            return
+        self.seen[key] = now
+        link.first += 1
+        heapq.heappush(self.pending, (packet.PacketCount, packet.Team_Number, next(self.sequence), now, received,
+                                      packet, fields))
+
+    def release(self, now, flush=False):
+        # Hold packets for reorder_delay so a copy arriving late on another link still lands in order
+        while self.pending and (flush or self.pending[0][3] + self.reorder_delay <= now):
+            _, _, _, _, received, packet, fields = heapq.heappop(self.pending)
+            self.comm.store_packet(packet, received)
+            self.comm.log_fields(fields)
+
+    def stop_reading(self):
+        self.reading = False
+
+    def stats(self):
+        return {link.name: link.stats() for link in self.links}
+
+    def dropped_frames(self):
+        return sum(link.frame_reader.dropped_frames for link in self.links)
@@ -1,27 +1,29 @@
+import time
+STARTED = time.perf_counter()  # taken before the heavy imports so time-to-first-frame covers them
+
 import sys
+import argparse
 import threading
+from functools import partial
 from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QLabel, QPushButton, \
     QSpacerItem, QSizePolicy, QGridLayout
-from PyQt5.QtCore import Qt, pyqtSignal, QObject, QTimer
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QPixmap, QIcon
 from communication import Communication
-from pressureGraph import PressureGraph
-from temperatureGraph import TemperatureGraph
-from altitudeGraph import AltitudeGraph
-from rotationGraph import RotationGraph
-from voltageGraph import VoltageGraph
-from time import time
-
-
-class SignalEmitter(QObject):
-    update_signal = pyqtSignal()
-
-    def emit_signal(self):
-        self.update_signal.emit()
+from transports import open_transport
+from renderScheduler import RenderScheduler
+from pipelineMetrics import format_metrics
+from sequenceTracker import format_link_quality
+from derivedMetrics import DerivedMetrics
+from alertRules import AlertEngine
+from sessionJournal import SessionJournal
+from telemetryStore import RECEIVED
 
 
 class GroundStation(QMainWindow):
-    def __init__(self):
+    def __init__(self, render_fps=30, graph_window=65536, replay=None, replay_speed=1.0, metrics_file=None,
+                 process_ingest=False, binary_log=None, links=None, startup_target_ms=1000, serve=None,
+                 journal='taternauts.journal', new_session=False, address='COM8', baud_rate=9600):
         super().__init__()
         self.setWindowTitle("Taternauts GS")
         self.setGeometry(100, 100, 1200, 800)
@@ -104,6 +106,28 @@ class GroundStation(QMainWindow):
         sidebar_layout.addWidget(self.liveSW_STATE)
         sidebar_layout.addWidget(self.livePL_STATE)
 
+        self.liveDescentRate = QLabel("Vertical Speed: N/A")
+        self.liveDescentRate.setStyleSheet("color: white;")
+        sidebar_layout.addWidget(self.liveDescentRate)
+
+        # Link quality from PacketCount sequence tracking
+        self.linkQualityLabel = QLabel("Link: N/A")
+        self.linkQualityLabel.setStyleSheet("color: white;")
+        sidebar_layout.addWidget(self.linkQualityLabel)
+
+        # Active alerts and the most recent alert messages
+        self.alertsLabel = QLabel("Alerts: none")
+        self.alertsLabel.setStyleSheet("color: #ff6060;")
+        self.alertsLabel.setWordWrap(True)
+        sidebar_layout.addWidget(self.alertsLabel)
+
+        # Pipeline health: packet rates, queue depths and per-stage p50/p99 latency
+        self.metricsLabel = QLabel("Pipeline: N/A")
+        self.metricsLabel.setFont(QFont("Arial", 8))
+        self.metricsLabel.setStyleSheet("color: white;")
+        sidebar_layout.addWidget(self.metricsLabel)
+        self.metrics_file = metrics_file
+
         sidebar_layout.addItem(QSpacerItem(10, 300))
         self.copyright = QLabel("Taternauts © 2024")
         self.copyright.setAlignment(Qt.AlignCenter)
@@ -111,31 +135,72 @@ class GroundStation(QMainWindow):
         self.copyright.setStyleSheet("color: white;")
         sidebar_layout.addWidget(self.copyright)
 
-        # Setup graphs
+        # Graphs are built once the window is up (see build_graphs), so the grid starts empty
         graphs_layout = QVBoxLayout()
-        graphs_grid = QGridLayout()
-
-        self.pressureGraph = PressureGraph()
-        self.temperatureGraph = TemperatureGraph()
-        self.rotationGraph = RotationGraph()
-        self.voltageGraph = VoltageGraph()
-        self.altitudeGraph = AltitudeGraph()
-
-        graphs_grid.addWidget(self.pressureGraph.win, 0, 0)
-        graphs_grid.addWidget(self.temperatureGraph.win, 0, 1)
-        graphs_grid.addWidget(self.altitudeGraph.win, 1, 0)
-        graphs_grid.addWidget(self.rotationGraph.win, 1, 1)
-        graphs_grid.addWidget(self.voltageGraph.win, 2, 0)
-
-        graphs_layout.addLayout(graphs_grid)
-
-        self.comm = Communication(serial_port='COM8')
+        self.graphs_grid = QGridLayout()
+        graphs_layout.addLayout(self.graphs_grid)
+        self.graph_window = graph_window
+        self.graphs = []
+        self.startup_target_ms = startup_target_ms
+
+        if replay:
+            # Replayed packets are logged separately so the source log is never appended to
+            self.comm = Communication(f"replay://{replay}", csv_filename='taternauts_replay.csv',
+                                      transport_factory=partial(open_transport, speed=replay_speed),
+                                      binary_log=binary_log)
+        else:
+            self.comm = Communication(address, baud_rate=baud_rate, binary_log=binary_log)
+
+        # Checkpoints the store every second so a crash or restart resumes with its history
+        self.journal = None
+        if journal and not replay:
+            self.journal = SessionJournal(self.comm.store, journal)
+            if new_session:
+                self.journal.discard()
+            elif self.journal.resume():
+                # The tail is enough for the link tracker to spot packets lost while we were down
+                records = self.comm.store.records(self.comm.sequence.window)
+                self.comm.sequence.update_batch(records["PacketCount"], records[RECEIVED])
+                print(f"Resumed {self.journal.restored} packets from {journal}")
+            self.journal.start()
 
         self.reader_thread = None
         self.reading_data = False
-
-        self.signal_emitter = SignalEmitter()
-        self.signal_emitter.update_signal.connect(self.update_graphs)
+        self.ingest = None
+        self.link_manager = None
+        if process_ingest and links:
+            # The ingest worker reads a single address; merging links happens in this process
+            raise ValueError("links cannot be combined with process_ingest")
+        if process_ingest:
+            from ingestProcess import IngestProcess
+            # Read and parse in a worker process that publishes into shared memory
+            self.ingest = IngestProcess(self.comm)
+        if links:
+            from linkManager import Link, LinkManager
+            # Several radios (primary/backup or several payloads) merged into the one telemetry store
+            self.link_manager = LinkManager(self.comm, [Link(link, link, baud_rate) for link in links])
+        self.reader = self.link_manager or self.comm
+        self.server = None
+        if serve:
+            from telemetryServer import TelemetryServer
+            # Fan live packets out to secondary consoles over TCP
+            self.server = TelemetryServer(self.comm.store, port=serve)
+            self.server.start()
+
+        # All graphs are fed and redrawn together from the telemetry store at render_fps
+        self.render_scheduler = RenderScheduler(self.comm.store, fps=render_fps, parent=self,
+                                                metrics=self.comm.metrics)
+
+        # Vertical speed, smoothing and rolling statistics computed incrementally per frame batch
+        self.derived = DerivedMetrics()
+        self.render_scheduler.add_graph(self.derived, "Altitude", "Pressure", "Voltage", "Time", "PacketCount")
+
+        # Alert rules are evaluated once per frame over the whole batch, off the ingest path
+        self.alerts = AlertEngine(log_path='taternauts_alerts.log')
+        self.alerts.add_callback(self.show_alerts)
+        self.render_scheduler.add_graph(self.alerts, *self.alerts.fields)
+        if self.ingest:
+            self.render_scheduler.add_source(self.ingest.pump)
 
         # Add the sidebar and main content layout to the content layout
         content_layout.addLayout(sidebar_layout)
@@ -149,6 +214,60 @@ class GroundStation(QMainWindow):
         self.timer.timeout.connect(self.update_live_data)
         self.timer.start(1000)  # Update every second
 
+        # Runs on the first event loop pass, right after the window has been shown
+        QTimer.singleShot(0, self.build_graphs)
+
+    def build_graphs(self):
+        if self.graphs:
+            return
+        first_frame_ms = (time.perf_counter() - STARTED) * 1000
+        # Importing pyqtgraph is the slowest part of startup, so it waits until the window is on screen
+        from pressureGraph import PressureGraph
+        from temperatureGraph import TemperatureGraph
+        from altitudeGraph import AltitudeGraph
+        from rotationGraph import RotationGraph
+        from voltageGraph import VoltageGraph
+        from verticalSpeedGraph import VerticalSpeedGraph
+
+        self.pressureGraph = PressureGraph(self.graph_window)
+        self.temperatureGraph = TemperatureGraph(self.graph_window)
+        self.rotationGraph = RotationGraph(self.graph_window)
+        self.voltageGraph = VoltageGraph(self.graph_window)
+        self.altitudeGraph = AltitudeGraph(self.graph_window)
+        self.verticalSpeedGraph = VerticalSpeedGraph(self.graph_window)
+        self.graphs = [self.pressureGraph, self.temperatureGraph, self.rotationGraph, self.voltageGraph,
+                       self.altitudeGraph, self.verticalSpeedGraph]
+
+        self.graphs_grid.addWidget(self.pressureGraph.win, 0, 0)
+        self.graphs_grid.addWidget(self.temperatureGraph.win, 0, 1)
+        self.graphs_grid.addWidget(self.altitudeGraph.win, 1, 0)
+        self.graphs_grid.addWidget(self.rotationGraph.win, 1, 1)
+        self.graphs_grid.addWidget(self.voltageGraph.win, 2, 0)
+        self.graphs_grid.addWidget(self.verticalSpeedGraph.win, 2, 1)
+
+        self.render_scheduler.add_graph(self.pressureGraph, "Pressure")
+        self.render_scheduler.add_graph(self.temperatureGraph, "Temperature")
+        self.render_scheduler.add_graph(self.altitudeGraph, "Altitude")
+        self.render_scheduler.add_graph(self.rotationGraph, "GYRO_R", "GYRO_P", "GYRO_Y")
+        self.render_scheduler.add_graph(self.voltageGraph, "Voltage")
+        self.derived.add_graph(self.verticalSpeedGraph, "vertical_speed_ema", "kalman_speed")
+
+        if self.comm.store.count:
+            # Redraw the resumed session: one frame feeds every graph the whole restored history
+            self.render_scheduler.rendered_count = self.comm.store.count - len(self.comm.store)
+            self.alerts.replaying = True
+            try:
+                self.render_scheduler.render_frame()
+            finally:
+                self.alerts.replaying = False
+
+        graphs_ready_ms = (time.perf_counter() - STARTED) * 1000
+        self.comm.metrics.set("startup_ms", round(graphs_ready_ms))
+        print(f"Startup: window {first_frame_ms:.0f} ms, graphs {graphs_ready_ms:.0f} ms "
+              f"(target {self.startup_target_ms} ms)")
+        if graphs_ready_ms > self.startup_target_ms:
+            print("Warning: startup exceeded its time-to-first-frame target")
+
     def toggle_data_transmission(self):
         if self.reading_data:
             self.stop_data_transmission()
@@ -158,62 +277,100 @@ class GroundStation(QMainWindow):
     def start_data_transmission(self):
         self.reading_data = True
         self.start_stop_button.setText("Stop")
-        self.reader_thread = threading.Thread(target=self.comm.read, args=(self.signal_emitter,))
-        self.reader_thread.start()
+        self.alerts.reset_stale()
+        if self.ingest:
+            self.ingest.start()
+        else:
+            self.reader_thread = threading.Thread(target=self.reader.read)
+            self.reader_thread.start()
+        self.render_scheduler.start()
 
     def stop_data_transmission(self):
         self.reading_data = False
         self.start_stop_button.setText("Start")
+        self.render_scheduler.stop()
+        if self.ingest:
+            self.ingest.stop()
         if self.reader_thread and self.reader_thread.is_alive():
-            self.comm.stop_reading()
+            self.reader.stop_reading()
             self.reader_thread.join()
             self.reader_thread = None
 
     def update_live_data(self):
-        self.liveTime.setText(f"Time Elapsed: {self.comm.getTime() or 'N/A'}")
-        self.livePacketCount.setText(f"Packet Count: {self.comm.getPacketCount() or 'N/A'}")
-        self.liveSW_STATE.setText(f"SW_STATE: {self.comm.getSW_STATE() or 'N/A'}")
-        self.livePL_STATE.setText(f"PL_STATE: {self.comm.getPL_STATE() or 'N/A'}")
-
-    def update_graphs(self):
-        current_time = time()
-
-        pressure = self.comm.getPressure()
-        if pressure is not None:
-            self.pressureGraph.update_graph(pressure, current_time)
-
-        temperature = self.comm.getTemperature()
-        if temperature is not None:
-            self.temperatureGraph.update_graph(temperature, current_time)
-
-        altitude = self.comm.getAltitude()
-        if altitude is not None:
-            self.altitudeGraph.update_graph(altitude, current_time)
+        packet = self.comm.latest_record()
+        if packet is not None:
+            self.liveTime.setText(f"Time Elapsed: {packet.Time or 'N/A'}")
+            self.livePacketCount.setText(f"Packet Count: {packet.PacketCount}")
+            self.liveSW_STATE.setText(f"SW_STATE: {packet.SW_STATE or 'N/A'}")
+            self.livePL_STATE.setText(f"PL_STATE: {packet.PL_STATE or 'N/A'}")
+
+        vertical_speed = self.derived.latest("kalman_speed")
+        if vertical_speed is not None:
+            self.liveDescentRate.setText(f"Vertical Speed: {vertical_speed:.1f} m/s")
+        self.linkQualityLabel.setText(format_link_quality(self.comm.link_quality()))
+
+        dropped_frames = None
+        if self.link_manager:
+            self.comm.metrics.set("links", self.link_manager.stats())
+            dropped_frames = self.link_manager.dropped_frames()
+        if self.reading_data:
+            self.alerts.check_stale()
 
-        gyro_r = self.comm.getGYRO_R()
-        gyro_p = self.comm.getGYRO_P()
-        gyro_y = self.comm.getGYRO_Y()
-        if gyro_r is not None and gyro_p is not None and gyro_y is not None:
-            self.rotationGraph.update_graph(gyro_r, gyro_p, gyro_y, current_time)
+        if self.ingest:
+            # The worker owns the reader and logger, and pump() has already copied in its gauges
+            snapshot = self.comm.metrics.snapshot()
+        else:
+            snapshot = self.comm.update_metrics(dropped_frames)
+        self.metricsLabel.setText(format_metrics(snapshot))
+        if self.metrics_file and self.reading_data:
+            self.comm.metrics.export(self.metrics_file, snapshot)
 
-        voltage = self.comm.getVoltage()
-        if voltage is not None:
-            self.voltageGraph.update_graph(voltage, current_time)
+    def show_alerts(self, alerts):
+        active = self.alerts.active()
+        lines = [f"ACTIVE: {', '.join(active)}"] if active else []
+        lines += [alert.message for alert in list(self.alerts.recent)[-3:]]
+        self.alertsLabel.setText("\n".join(lines) or "Alerts: none")
 
     def reset_graphs(self):
-        self.pressureGraph.reset_graph()
-        self.temperatureGraph.reset_graph()
-        self.altitudeGraph.reset_graph()
-        self.rotationGraph.reset_graph()
-        self.voltageGraph.reset_graph()
+        for graph in self.graphs:
+            graph.reset_graph()
+        if self.journal:
+            # A reset starts a new session, so the cleared history does not come back on relaunch
+            self.journal.discard()
 
     def closeEvent(self, event):
         self.stop_data_transmission()
+        if self.server:
+            self.server.stop()
+        if self.journal:
+            self.journal.close()
         super().closeEvent(event)
 
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    window = GroundStation()
+    parser = argparse.ArgumentParser(description="Taternauts ground station")
+    parser.add_argument('--port', default='COM8',
+                        help="radio link: a serial port, udp://[HOST]:PORT, tcp://HOST:PORT or pty://")
+    parser.add_argument('--baud', type=int, default=9600)
+    parser.add_argument('--replay', help="replay a taternauts.csv log instead of reading the radio")
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help="replay speed multiplier, 0 for as fast as possible")
+    parser.add_argument('--process-ingest', action='store_true',
+                        help="read and parse the serial stream in a separate process")
+    parser.add_argument('--links', nargs='+', metavar='PORT', help="read and merge several links")
+    parser.add_argument('--serve', type=int, metavar='PORT', help="publish live telemetry to subscribers on PORT")
+    parser.add_argument('--binary-log', help="also record packets to this binary log file")
+    parser.add_argument('--new-session', action='store_true',
+                        help="start with empty graphs instead of resuming the last session journal")
+    parser.add_argument('--metrics-file', help="append pipeline metrics to this file as JSON lines every second")
+    args, qt_args = parser.parse_known_args()
+    if args.links and args.process_ingest:
+        parser.error("--links cannot be combined with --process-ingest")
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = GroundStation(replay=args.replay, replay_speed=args.speed, metrics_file=args.metrics_file,
+                           process_ingest=args.process_ingest, binary_log=args.binary_log,
+                           links=args.links, serve=args.serve, new_session=args.new_session,
+                           address=args.port, baud_rate=args.baud)
     window.show()
     app.exec_()
@@ -0,0 +1,88 @@
+from collections import namedtuple
+import numpy as np
+
+
+Field = namedtuple("Field", ["name", "type", "dtype"])
+
+TEAM_ID = 1002
+TERMINATOR = "POTATO"
+
+# Telemetry fields in the order the vehicle sends them; every frame ends with the POTATO marker.
+# Text fields are stored as fixed-width ASCII bytes: numpy's U dtype is 4 bytes per character
+SCHEMA = [
+    Field("Team_Number", int, np.int32),
+    Field("Time", str, "S16"),
+    Field("PacketCount", int, np.int64),
+    Field("SW_STATE", str, "S16"),
+    Field("PL_STATE", str, "S16"),
+    Field("Altitude", float, np.float64),
+    Field("Temperature", float, np.float64),
+    Field("Voltage", float, np.float64),
+    Field("GYRO_R", float, np.float64),
+    Field("GYRO_P", float, np.float64),
+    Field("GYRO_Y", float, np.float64),
+    Field("Pressure", float, np.float64),
+]
+
+HEADER = [field.name for field in SCHEMA] + [TERMINATOR]
+FIELDS = [(field.name, field.dtype) for field in SCHEMA]
+
+Packet = namedtuple("Packet", [field.name for field in SCHEMA])
+
+
+def ascii_field(text):
+    # Anything outside ASCII in a text field is line noise, and would not fit the byte-string columns
+    text = text.strip()
+    if not text.isascii():
+        raise ValueError(f"non-ASCII text field {text!r}")
+    return text
+
+
+def as_text(value):
+    # Text columns read back as bytes; everything that shows or compares them wants str
+    return value.decode('ascii', 'replace') if isinstance(value, bytes) else str(value)
+
+
+def compile_converter(schema):
+    # Build one flat function for the whole frame, e.g. Packet(int(f[0]), f[1].strip(), ...),
+    # so a packet costs a single call and a single try instead of one per field
+    conversions = []
+    for index, field in enumerate(schema):
+        if field.type is str:
+            conversions.append(f"ascii_field(f[{index}])")
+        else:
+            conversions.append(f"{field.type.__name__}(f[{index}])")
+    source = f"def convert(f):\n    return Packet({', '.join(conversions)})\n"
+    namespace = {"Packet": Packet, "ascii_field": ascii_field}
+    exec(source, namespace)
+    return namespace["convert"]
+
+
+class PacketParser:
+
+    def __init__(self, schema=SCHEMA, team_id=TEAM_ID):
+        self.schema = schema
+        self.team_id = team_id
+        self.field_count = len(schema) + 1
+        self.convert = compile_converter(schema)
+        self.packets = 0
+        self.malformed = 0
+        self.wrong_team = 0
+
+    def parse(self, line):
+        return self.parse_fields(line.split(','))
+
+    def parse_fields(self, fields):
+        if len(fields) != self.field_count or fields[-1].strip() != TERMINATOR:
+            self.malformed += 1
+            return None
+        try:
+            packet = self.convert(fields)
+        except ValueError:
+            self.malformed += 1
+            return None
+        if self.team_id is not None and packet.Team_Number != self.team_id:
+            self.wrong_team += 1
+            return None
+        self.packets += 1
+        return packet
@@ -0,0 +1,95 @@
+import json
+import time
+import numpy as np
+
+
+class StageTimer:
+
+    def __init__(self, size=1024):
+        # Recent durations only: a fixed reservoir keeps recording O(1) and memory flat
+        self.samples = np.zeros(size, dtype=np.int64)
+        self.size = size
+        self.count = 0
+        self.total_ns = 0
+
+    def record(self, duration_ns):
+        self.samples[self.count % self.size] = duration_ns
+        self.count += 1
+        self.total_ns += duration_ns
+
+    def start(self):
+        return time.perf_counter_ns()
+
+    def stop(self, started_ns):
+        self.record(time.perf_counter_ns() - started_ns)
+
+    def percentiles(self):
+        n = min(self.count, self.size)
+        if n == 0:
+            return None, None
+        p50, p99 = np.percentile(self.samples[:n], [50, 99])
+        return p50 / 1000.0, p99 / 1000.0
+
+
+class PipelineMetrics:
+
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.timers = {}
+        self.last_time = time.monotonic()
+        self.last_counters = {}
+
+    def add(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, name, value):
+        self.gauges[name] = value
+
+    def timer(self, name):
+        timer = self.timers.get(name)
+        if timer is None:
+            timer = self.timers[name] = StageTimer()
+        return timer
+
+    def snapshot(self):
+        now = time.monotonic()
+        elapsed = max(now - self.last_time, 1e-9)
+        counters = dict(self.counters)
+        rates = {name: (value - self.last_counters.get(name, 0)) / elapsed for name, value in counters.items()}
+        self.last_time = now
+        self.last_counters = counters
+
+        latencies = {}
+        for name, timer in list(self.timers.items()):
+            p50, p99 = timer.percentiles()
+            if p50 is not None:
+                latencies[name] = {"p50_us": p50, "p99_us": p99, "count": timer.count}
+        return {"time": time.time(), "counters": counters, "rates": rates, "gauges": dict(self.gauges),
+                "latency": latencies}
+
+    def export(self, path, snapshot=None):
+        with open(path, mode='a') as file:
+            file.write(json.dumps(snapshot or self.snapshot()) + "\n")
+
+
+def format_metrics(snapshot):
+    counters = snapshot["counters"]
+    rates = snapshot["rates"]
+    gauges = snapshot["gauges"]
+    lines = [
+        f"Packets in: {counters.get('packets_in', 0)} ({rates.get('packets_in', 0):.1f}/s)",
+        f"Packets drawn: {counters.get('packets_out', 0)}",
+        f"Parse errors: {counters.get('parse_errors', 0)}",
+        f"Dropped frames: {gauges.get('dropped_frames', 0)}",
+        f"Link: {rates.get('bytes_in', 0) / 1024:.1f} KiB/s",
+        f"Log queue: {gauges.get('log_queue', 0)} (dropped {gauges.get('log_dropped', 0)})",
+    ]
+    if gauges.get("log_error"):
+        lines.append(f"Log error: {gauges['log_error']}")
+    for name, link in gauges.get("links", {}).items():
+        lines.append(f"{name}: {link['frames']} frames, {link['first']} first, {link['duplicates']} dup"
+                     + (" DOWN" if link['error'] else ""))
+    for name, latency in snapshot["latency"].items():
+        lines.append(f"{name}: {latency['p50_us']:.0f} / {latency['p99_us']:.0f} µs")
+    return "\n".join(lines)
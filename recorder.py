@@ -0,0 +1,94 @@
+import argparse
+import os
+import signal
+import sys
+import threading
+import time
+from functools import partial
+from communication import Communication
+from transports import open_transport
+
+
+def format_stats(comm, snapshot):
+    counters = snapshot["counters"]
+    rates = snapshot["rates"]
+    link = comm.link_quality()
+    return (f"{time.strftime('%H:%M:%S')} packets {comm.store.count} ({rates.get('packets_in', 0):.1f}/s, "
+            f"{rates.get('bytes_in', 0) / 1024:.1f} KiB/s) errors {counters.get('parse_errors', 0)} "
+            f"lost {link['lost']} ({link['loss_rate'] * 100:.1f}%) dup {link['duplicates']} "
+            f"reorder {link['reordered']} jitter {link['jitter'] * 1000:.1f} ms "
+            f"log queue {snapshot['gauges'].get('log_queue', 0)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Taternauts telemetry recorder (no GUI)")
+    parser.add_argument('--port', default='COM8',
+                        help="radio link: a serial port, udp://[HOST]:PORT, tcp://HOST:PORT or pty://")
+    parser.add_argument('--baud', type=int, default=9600)
+    parser.add_argument('--links', nargs='+', metavar='PORT', help="read and merge several links")
+    parser.add_argument('--replay', help="replay a taternauts.csv log instead of reading a port")
+    parser.add_argument('--speed', type=float, default=0, help="replay speed multiplier, 0 for as fast as possible")
+    parser.add_argument('--csv', help="CSV log file (default taternauts.csv, or taternauts_replay.csv with --replay)")
+    parser.add_argument('--no-csv', action='store_true', help="do not write the CSV log")
+    parser.add_argument('--binary-log', help="also record packets to this binary log file")
+    parser.add_argument('--poll', type=float, default=0.2,
+                        help="seconds to wait on an idle port; longer uses less CPU, shorter stops faster")
+    parser.add_argument('--serve', type=int, metavar='PORT', help="publish live telemetry to subscribers on PORT")
+    parser.add_argument('--stats-interval', type=float, default=5.0)
+    parser.add_argument('--metrics-file', help="append pipeline metrics to this file as JSON lines")
+    args = parser.parse_args()
+    if args.csv is None:
+        # Like the GUI, a replay never appends to the live log
+        args.csv = 'taternauts_replay.csv' if args.replay else 'taternauts.csv'
+    if args.replay and not args.no_csv and os.path.abspath(args.csv) == os.path.abspath(args.replay):
+        parser.error("--csv must not be the log being replayed")
+
+    address = f"replay://{args.replay}" if args.replay else args.port
+    factory = partial(open_transport, speed=args.speed) if args.replay else open_transport
+    # Only a small window of history is kept in memory; the logs are the record
+    comm = Communication(address, baud_rate=args.baud, timeout=args.poll,
+                         csv_filename=None if args.no_csv else args.csv, capacity=1024,
+                         binary_log=args.binary_log, transport_factory=factory)
+
+    reader = comm
+    if args.links:
+        from linkManager import Link, LinkManager
+        reader = LinkManager(comm, [Link(port, port, args.baud) for port in args.links], poll_interval=args.poll)
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    server = None
+    if args.serve:
+        from telemetryServer import TelemetryServer
+        server = TelemetryServer(comm.store, host='0.0.0.0', port=args.serve)
+        server.start()
+
+    thread = threading.Thread(target=reader.read, name="Recorder")
+    thread.start()
+    try:
+        # Short waits so the end of a replay is noticed promptly; stats still print every stats_interval
+        next_stats = time.monotonic() + args.stats_interval
+        while not stop.wait(0.2) and thread.is_alive():
+            if time.monotonic() < next_stats:
+                continue
+            next_stats += args.stats_interval
+            snapshot = comm.update_metrics(reader.dropped_frames() if args.links else None)
+            print(format_stats(comm, snapshot), flush=True)
+            if args.metrics_file:
+                comm.metrics.export(args.metrics_file, snapshot)
+    finally:
+        reader.stop_reading()
+        thread.join()
+        if server:
+            server.stop()
+        print(format_stats(comm, comm.update_metrics(reader.dropped_frames() if args.links else None)))
+        if args.links:
+            for name, stats in reader.stats().items():
+                print(f"{name}: {stats}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
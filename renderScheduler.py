@@ -0,0 +1,125 @@
+import time
+from PyQt5.QtCore import QObject, QTimer
+from telemetryStore import RECEIVED
+
+
+class RenderScheduler(QObject):
+
+    def __init__(self, store, fps=30, parent=None, metrics=None, min_fps=2, paint_budget=0.25, adaptive=True):
+        super().__init__(parent)
+        self.store = store
+        self.metrics = metrics
+        self.fps = fps
+        self.max_fps = fps
+        self.min_fps = min_fps
+        # Fraction of each frame interval that drawing is allowed to take before the frame rate backs off
+        self.paint_budget = paint_budget
+        self.adaptive = adaptive
+        self.paint_time = 0.0
+        self.rate_started = time.perf_counter()
+        self.rate_packets = 0
+        self.targets = []
+        self.frame_callbacks = []
+        self.sources = []
+        self.rendered_count = store.count
+
+        # One shared timer drives every graph; packets that arrive between ticks are drawn together
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.render_frame)
+
+    def add_graph(self, graph, *fields):
+        self.targets.append((graph, fields))
+
+    def add_source(self, source):
+        # Called at the start of every frame to pull in data produced outside this thread
+        self.sources.append(source)
+
+    def add_frame_callback(self, callback):
+        self.frame_callbacks.append(callback)
+
+    def set_fps(self, fps):
+        self.max_fps = fps
+        self.apply_fps(fps)
+
+    def apply_fps(self, fps):
+        self.fps = fps
+        if self.metrics:
+            self.metrics.set("render_fps", round(fps, 1))
+        if self.timer.isActive():
+            self.timer.start(self.interval())
+
+    def interval(self):
+        return max(1, int(1000 / self.fps))
+
+    def start(self):
+        self.rendered_count = self.store.count
+        self.rate_started = time.perf_counter()
+        self.rate_packets = 0
+        self.timer.start(self.interval())
+
+    def window_visible(self):
+        window = self.parent()
+        if window is None or not hasattr(window, 'isMinimized'):
+            return True
+        return window.isVisible() and not window.isMinimized()
+
+    def stop(self):
+        self.timer.stop()
+
+    def render_frame(self):
+        for source in self.sources:
+            source()
+        visible = self.window_visible()
+        if self.store.count != self.rendered_count:
+            # One consistent batch per frame, so every graph sees the same packets even while the reader appends
+            self.rendered_count, records = self.store.since(self.rendered_count)
+            timestamps = records[RECEIVED]
+            # Derived metrics and alerts keep running while minimized; only drawing is skipped
+            for graph, fields in self.targets:
+                graph.update_batch(*[records[field] for field in fields], timestamps)
+            self.rate_packets += len(records)
+            if self.metrics:
+                self.metrics.add("packets_out", len(records))
+            if visible:
+                self.draw()
+            for callback in self.frame_callbacks:
+                callback()
+        elif visible:
+            # Only graphs that were resized or just shown again redraw
+            self.draw()
+        if self.adaptive:
+            self.adapt(visible)
+
+    def draw(self):
+        started = time.perf_counter_ns()
+        for graph, fields in self.targets:
+            if self.metrics:
+                draw_timer = self.metrics.timer(f"draw_{graph.title}")
+                draw_started = draw_timer.start()
+                graph.update_gui()
+                draw_timer.stop(draw_started)
+            else:
+                graph.update_gui()
+        elapsed_ns = time.perf_counter_ns() - started
+        if self.metrics:
+            self.metrics.timer("render").record(elapsed_ns)
+        self.paint_time = 0.8 * self.paint_time + 0.2 * elapsed_ns / 1e9
+
+    def adapt(self, visible):
+        now = time.perf_counter()
+        elapsed = now - self.rate_started
+        if elapsed < 1.0:
+            return
+        packet_rate = self.rate_packets / elapsed
+        self.rate_started = now
+        self.rate_packets = 0
+        if visible:
+            # No faster than twice the packet rate, and slow enough that drawing stays within its budget
+            fps = min(self.max_fps, 2 * packet_rate)
+            if self.paint_time > 0:
+                fps = min(fps, self.paint_budget / self.paint_time)
+            fps = max(fps, self.min_fps)
+        else:
+            fps = self.min_fps
+        if abs(fps - self.fps) > 0.2 * self.fps:
+            self.apply_fps(fps)
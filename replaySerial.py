@@ -0,0 +1,154 @@
+import mmap
+import os
+import time
+from packetSchema import PacketParser, as_text
+
+
+def parse_mission_time(text):
+    try:
+        parts = [float(part) for part in text.split(':')]
+    except ValueError:
+        return None
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + part
+    return seconds
+
+
+class MissionClock:
+
+    def __init__(self, interval=1.0, max_gap=5.0):
+        self.interval = interval
+        # A forward jump longer than max_gap intervals is only a real gap (a blackout) when PacketCount
+        # skipped about as far; otherwise it is a corrupted Time field or a clock reset
+        self.max_gap = max_gap
+        self.elapsed = None
+        self.last_time = None
+        self.last_count = None
+
+    def advance(self, mission_time, packet_count=None):
+        # Seconds since the first row; rows with no usable time continue at the nominal packet interval
+        limit = self.max_gap * self.interval
+        step = count_step = None
+        if packet_count is not None:
+            if self.last_count is not None and 0 < packet_count - self.last_count:
+                count_step = (packet_count - self.last_count) * self.interval
+            self.last_count = packet_count
+        if mission_time is not None:
+            if self.last_time is not None:
+                step = mission_time - self.last_time
+            self.last_time = mission_time
+        if step is not None and step > limit and (count_step is None or abs(step - count_step) > limit):
+            step = None
+        if step is None or step < 0:
+            step = count_step if count_step is not None and count_step <= limit else self.interval
+        self.elapsed = 0.0 if self.elapsed is None else self.elapsed + step
+        return self.elapsed
+
+    def advance_all(self, mission_times, packet_counts=None):
+        # Mission seconds for a whole column of Time values, for derivatives that must not use arrival time
+        if packet_counts is None:
+            return [self.advance(parse_mission_time(as_text(text))) for text in mission_times]
+        return [self.advance(parse_mission_time(as_text(text)), count)
+                for text, count in zip(mission_times, packet_counts.tolist())]
+
+
+class ReplaySerial:
+
+    def __init__(self, port, baudrate=9600, timeout=None, speed=1.0, interval=1.0, max_pending=65536):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.speed = speed  # 1.0 is real time, 0 replays as fast as the reader can take it
+        self.interval = interval  # spacing used when a row's Time field can't be parsed
+        self.max_pending = max_pending
+        self.clock = MissionClock(interval)
+        self.parser = PacketParser(team_id=None)
+        self.file = open(port, 'rb')
+        # Logs can be hundreds of MB, so rows are sliced straight out of the mapped file
+        size = os.fstat(self.file.fileno()).st_size
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.offset = 0
+        self.pending = bytearray()
+        self.next_row = None
+        self.next_due = None
+        self.start = time.monotonic()
+        self.finished = False
+        self.is_open = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if self.is_open:
+            if isinstance(self.map, mmap.mmap):
+                self.map.close()
+            self.file.close()
+            self.is_open = False
+
+    def next_line(self):
+        while self.offset < len(self.map):
+            end = self.map.find(b'\n', self.offset)
+            if end < 0:
+                end = len(self.map)
+            line = self.map[self.offset:end].strip()
+            self.offset = end + 1
+            # Every Communication session appends its own header row
+            if line and not line.startswith(b'Team_Number'):
+                return line
+        return None
+
+    def due_time(self, line):
+        if not self.speed:
+            return self.start
+        packet = self.parser.parse(line.decode('utf-8', 'replace'))
+        if packet is None:
+            # A corrupted row goes out with the one before it rather than moving the replay clock
+            return self.next_due if self.next_due is not None else self.start
+        return self.start + self.clock.advance(parse_mission_time(packet.Time), packet.PacketCount) / self.speed
+
+    def advance(self):
+        now = time.monotonic()
+        while len(self.pending) < self.max_pending:
+            if self.next_row is None:
+                self.next_row = self.next_line()
+                if self.next_row is None:
+                    self.finished = True
+                    break
+                self.next_due = self.due_time(self.next_row)
+            if self.next_due > now:
+                break
+            self.pending += self.next_row
+            self.pending += b'\r\n'
+            self.next_row = None
+
+    @property
+    def in_waiting(self):
+        self.advance()
+        return len(self.pending)
+
+    def wait(self):
+        self.advance()
+        if not self.pending:
+            # Behave like an idle port: wait for the next row or the read timeout, whichever is first
+            wait = self.timeout if self.timeout is not None else self.interval
+            if self.next_due is not None and not self.finished:
+                wait = min(wait, max(0.0, self.next_due - time.monotonic()))
+            time.sleep(wait)
+            self.advance()
+
+    def read(self, size=1):
+        self.wait()
+        data = bytes(self.pending[:size])
+        del self.pending[:size]
+        return data
+
+    def read_chunk(self):
+        # Transport interface: every row that is due, or b'' if none came due within the timeout
+        self.wait()
+        data = bytes(self.pending)
+        self.pending.clear()
+        return data
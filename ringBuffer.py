@@ -0,0 +1,40 @@
+import numpy as np
+
+
+class RingBuffer:
+
+    def __init__(self, capacity, series=1):
+        self.capacity = capacity
+        self.count = 0
+        # Mirrored storage: every sample lives at pos and pos + capacity, so the retained
+        # window is always one contiguous slice that can go straight to setData
+        self.timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self.values = np.zeros((series, 2 * capacity), dtype=np.float64)
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def extend(self, timestamps, *series):
+        n = len(timestamps)
+        if n > self.capacity:
+            timestamps = timestamps[-self.capacity:]
+            series = [values[-self.capacity:] for values in series]
+            self.count += n - self.capacity
+            n = self.capacity
+        if n == 0:
+            return
+        pos = (self.count + np.arange(n)) % self.capacity
+        self.timestamps[pos] = timestamps
+        self.timestamps[pos + self.capacity] = timestamps
+        for row, values in enumerate(series):
+            self.values[row, pos] = values
+            self.values[row, pos + self.capacity] = values
+        self.count += n
+
+    def window(self):
+        n = len(self)
+        end = (self.count - 1) % self.capacity + self.capacity + 1
+        return self.timestamps[end - n:end], self.values[:, end - n:end]
+
+    def clear(self):
+        self.count = 0
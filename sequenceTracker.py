@@ -0,0 +1,130 @@
+import math
+
+
+class SequenceTracker:
+
+    def __init__(self, max_gaps=256, window=1024):
+        self.max_gaps = max_gaps
+        self.window = window  # how far back a late or duplicate packet is still recognised
+        self.reset()
+
+    def reset(self):
+        self.received = 0
+        self.expected = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.resets = 0
+        self.corrupted = 0
+        self.held = None
+        self.gaps = []
+        self.highest = None
+        self.recent = set()
+        self.missing = set()
+        self.last_arrival = None
+        # Welford running mean/variance of inter-arrival time, plus jitter as in RFC 3550
+        self.intervals = 0
+        self.interval_mean = 0.0
+        self.interval_m2 = 0.0
+        self.jitter = 0.0
+        self.last_interval = None
+
+    def update(self, packet_count, arrival):
+        self.received += 1
+        self.update_timing(arrival)
+
+        # Frames carry no checksum, so a bit-flipped PacketCount can still parse. A jump past the window
+        # or a counter restart is only believed once the packet after it follows on
+        if self.held is not None:
+            held, self.held = self.held, None
+            if held < packet_count <= held + self.window:
+                self.accept(held)
+            else:
+                self.corrupted += 1
+        if self.highest is not None and not self.plausible(packet_count):
+            self.held = packet_count
+            return
+        self.accept(packet_count)
+
+    def plausible(self, packet_count):
+        if packet_count > self.highest:
+            return packet_count <= self.highest + self.window
+        return packet_count in self.missing or packet_count in self.recent
+
+    def accept(self, packet_count):
+        if self.highest is None:
+            self.start_session(packet_count)
+        elif packet_count > self.highest:
+            first_missing = self.highest + 1
+            if packet_count > first_missing:
+                self.lost += packet_count - first_missing
+                self.gaps.append((first_missing, packet_count - 1))
+                if len(self.gaps) > self.max_gaps:
+                    del self.gaps[0]
+                self.missing.update(range(max(first_missing, packet_count - self.window), packet_count))
+            self.expected += packet_count - self.highest
+            self.highest = packet_count
+            self.remember(packet_count)
+        elif packet_count in self.missing:
+            # A late packet fills a hole we already counted as lost
+            self.missing.discard(packet_count)
+            self.reordered += 1
+            self.lost -= 1
+            self.recent.add(packet_count)
+        elif packet_count in self.recent:
+            self.duplicates += 1
+        else:
+            # Neither late nor a repeat: the vehicle restarted its counter
+            self.resets += 1
+            self.start_session(packet_count)
+
+    def start_session(self, packet_count):
+        self.highest = packet_count
+        self.expected += 1
+        self.recent.clear()
+        self.missing.clear()
+        self.remember(packet_count)
+
+    def remember(self, packet_count):
+        self.recent.add(packet_count)
+        # Only the last `window` counts are tracked, so memory and cost stay O(1) per packet
+        if len(self.recent) + len(self.missing) > 2 * self.window:
+            oldest = self.highest - self.window
+            self.recent = {count for count in self.recent if count > oldest}
+            self.missing = {count for count in self.missing if count > oldest}
+
+    def update_timing(self, arrival):
+        if self.last_arrival is not None:
+            interval = arrival - self.last_arrival
+            self.intervals += 1
+            delta = interval - self.interval_mean
+            self.interval_mean += delta / self.intervals
+            self.interval_m2 += delta * (interval - self.interval_mean)
+            if self.last_interval is not None:
+                self.jitter += (abs(interval - self.last_interval) - self.jitter) / 16
+            self.last_interval = interval
+        self.last_arrival = arrival
+
+    def update_batch(self, packet_counts, arrivals):
+        for packet_count, arrival in zip(packet_counts.tolist(), arrivals.tolist()):
+            self.update(packet_count, arrival)
+
+    @property
+    def loss_rate(self):
+        return self.lost / self.expected if self.expected else 0.0
+
+    def stats(self):
+        stddev = math.sqrt(self.interval_m2 / (self.intervals - 1)) if self.intervals > 1 else 0.0
+        return {"received": self.received, "expected": self.expected, "lost": self.lost,
+                "loss_rate": self.loss_rate, "duplicates": self.duplicates, "reordered": self.reordered,
+                "resets": self.resets, "corrupted": self.corrupted, "gaps": list(self.gaps[-10:]), "interval_mean": self.interval_mean,
+                "interval_stddev": stddev, "jitter": self.jitter}
+
+
+def format_link_quality(stats):
+    return "\n".join([
+        f"Loss: {stats['lost']} ({stats['loss_rate'] * 100:.1f}%)",
+        f"Dup/reorder: {stats['duplicates']} / {stats['reordered']}",
+        f"Interval: {stats['interval_mean'] * 1000:.0f} ± {stats['interval_stddev'] * 1000:.0f} ms",
+        f"Jitter: {stats['jitter'] * 1000:.1f} ms",
+    ])
@@ -0,0 +1,120 @@
+import os
+import threading
+import numpy as np
+from binaryLog import BinaryLogReader, BinaryLogWriter
+from telemetryStore import RECORD_DTYPE
+
+
+class SessionJournal:
+
+    def __init__(self, store, path='taternauts.journal', fsync_interval=5.0, compact_factor=2, interval=1.0):
+        self.store = store
+        self.path = path
+        self.interval = interval
+        # Once the file holds compact_factor times the store's capacity it is cut back to one capacity
+        self.compact_factor = compact_factor
+        # Same fixed-width format as the binary log, so a journal can also be analysed like one
+        self.writer = BinaryLogWriter(path, fsync_interval=fsync_interval)
+        self.journaled = store.count
+        self.restored = 0
+        # Checkpoints (and their fsyncs and compactions) run on their own thread, off the GUI thread;
+        # the lock keeps a GUI-side discard() or close() from interleaving with one
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.error = None
+
+    def start(self):
+        if self.thread is not None:
+            return
+        self.stopping.clear()
+        self.thread = threading.Thread(target=self.run, name="SessionJournal", daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while not self.stopping.wait(self.interval):
+            try:
+                self.checkpoint()
+                self.error = None
+            except (OSError, ValueError) as e:
+                # A full or pulled drive only costs the resume history; keep trying on the next interval
+                if self.error is None:
+                    print(f"Session journal checkpoint failed: {e}")
+                self.error = e
+
+    def stop(self):
+        if self.thread is None:
+            return
+        self.stopping.set()
+        self.thread.join()
+        self.thread = None
+
+    def resume(self):
+        # Refill the store with the newest records of the previous run, in one vectorised copy
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return 0
+        try:
+            reader = BinaryLogReader(self.path)
+        except ValueError as e:
+            print(f"Ignoring unreadable session journal: {e}")
+            self.discard()
+            return 0
+        try:
+            if reader.dtype != RECORD_DTYPE:
+                print("Session journal was written with a different packet schema; starting a new session")
+                reader.close()
+                self.discard()
+                return 0
+            records = np.array(reader.records[-self.store.capacity:])
+        finally:
+            reader.close()
+        self.store.extend(records)
+        self.journaled = self.store.count
+        self.restored = len(records)
+        return self.restored
+
+    def checkpoint(self):
+        with self.lock:
+            return self.write_checkpoint()
+
+    def write_checkpoint(self):
+        # Appends only what arrived since the last checkpoint; the ingest path never touches the journal
+        if self.store.count == self.journaled:
+            return 0
+        self.journaled, records = self.store.since(self.journaled)
+        self.writer.extend(records)
+        self.writer.flush()
+        if self.writer.records >= self.compact_factor * self.store.capacity:
+            self.compact()
+        return len(records)
+
+    def compact(self):
+        # Resume only ever reads the newest capacity records, so everything older can go
+        self.writer.close()
+        reader = BinaryLogReader(self.path)
+        try:
+            records = np.array(reader.records[-self.store.capacity:])
+        finally:
+            reader.close()
+        compacted = BinaryLogWriter(self.path + '.tmp')
+        for path in (compacted.path, compacted.index_path):
+            if os.path.exists(path):
+                os.remove(path)
+        compacted.extend(records)
+        compacted.close()
+        os.replace(compacted.path, self.path)
+        os.replace(compacted.index_path, self.writer.index_path)
+
+    def close(self):
+        self.stop()
+        with self.lock:
+            self.write_checkpoint()
+            self.writer.close()
+
+    def discard(self):
+        with self.lock:
+            self.writer.close()
+            for path in (self.path, self.writer.index_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.journaled = self.store.count
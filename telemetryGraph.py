@@ -0,0 +1,81 @@
+import sys
+import numpy as np
+import pyqtgraph as pg
+from PyQt5 import QtWidgets
+import time
+from decimation import MinMaxPyramid
+
+# Global pyqtgraph look, applied once for every graph
+pg.setConfigOption('background', 'w')
+pg.setConfigOption('foreground', 'k')
+
+
+class TelemetryGraph:
+
+    def __init__(self, title, series, y_range, window=20):
+        self.title = title
+        # Not shown on its own: the widget is embedded in the ground station layout
+        self.win = pg.GraphicsLayoutWidget(title=title)
+        self.plot = self.win.addPlot(title=title)
+
+        if len(series) > 1:
+            self.plot.addLegend()
+        # connect='finite' leaves gaps where a packet field failed to parse (NaN)
+        self.curves = [self.plot.plot(pen=pen, name=name, connect='finite') for name, pen in series]
+        self.curve = self.curves[0]
+
+        self.buffer = MinMaxPyramid(window, len(series))
+        self.start_time = None
+        # Redraw only when there are new samples or the plot was resized
+        self.dirty = False
+        self.drawn_width = None
+
+        self.plot.setLabel('bottom', 'Time', 's')
+        self.plot.setRange(yRange=y_range)
+
+    def start_tracking(self, timestamp=None):
+        # The time axis starts at the first sample, which may predate this run when history is restored
+        if self.start_time is None:
+            self.start_time = time.time() if timestamp is None else timestamp
+
+    def update_graph(self, *args):
+        *values, timestamp = args
+        self.start_tracking(timestamp)
+        self.buffer.extend(np.array([timestamp - self.start_time]), *[[value] for value in values])
+        self.dirty = True
+
+    def update_batch(self, *args):
+        *series, timestamps = args
+        if len(timestamps) == 0:
+            return
+        self.start_tracking(float(timestamps[0]))
+        self.buffer.extend(timestamps - self.start_time, *series)
+        self.dirty = True
+
+    def update_gui(self):
+        # Hidden or minimized plots keep buffering and catch up in one draw when shown again
+        if not self.win.isVisible() or self.win.window().isMinimized():
+            return
+        width = max(int(self.plot.vb.width()), 100)
+        if self.dirty or width != self.drawn_width:
+            self.draw(width)
+
+    def draw(self, max_points):
+        # Draw about one min/max pair per horizontal pixel however long the history is
+        timestamps, values = self.buffer.window(max_points)
+        for curve, row in zip(self.curves, values):
+            curve.setData(timestamps, row)
+        if len(timestamps) > 1:
+            self.plot.setXRange(timestamps[0], timestamps[-1])
+        self.dirty = False
+        self.drawn_width = max_points
+
+    def start(self):
+        app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+        self.win.show()
+        sys.exit(app.exec_())
+
+    def reset_graph(self):
+        self.buffer.clear()
+        self.start_time = None
+        self.dirty = True
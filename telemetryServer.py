@@ -0,0 +1,176 @@
+import argparse
+import asyncio
+import json
+import socket
+import struct
+import sys
+import threading
+from collections import deque
+import numpy as np
+from telemetryStore import RECORD_DTYPE
+
+SCHEMA_MESSAGE = b'S'
+BATCH_MESSAGE = b'B'
+MESSAGE_HEADER = struct.Struct('<cI')
+
+
+def encode_message(kind, payload):
+    return MESSAGE_HEADER.pack(kind, len(payload)) + payload
+
+
+def schema_payload():
+    fields = [[name, RECORD_DTYPE.fields[name][0].str] for name in RECORD_DTYPE.names]
+    return json.dumps({"fields": fields}).encode()
+
+
+class Subscriber:
+
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue = deque(maxlen=queue_size)
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+
+    def push(self, message):
+        # Drop-oldest: a slow client loses history, never stalls the publisher
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(message)
+        self.ready.set()
+
+
+class TelemetryServer:
+
+    def __init__(self, store, host='127.0.0.1', port=5802, unix_path=None, queue_size=64, snapshot_size=1024,
+                 poll_interval=0.05):
+        self.store = store
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.queue_size = queue_size
+        self.snapshot_size = snapshot_size
+        self.poll_interval = poll_interval
+        self.subscribers = set()
+        self.clients = set()
+        self.published = store.count
+        self.loop = None
+        self.thread = None
+        self.stopping = None
+        self.total_dropped = 0
+
+    def start(self):
+        started = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(started,), name="TelemetryServer", daemon=True)
+        self.thread.start()
+        started.wait()
+
+    def run(self, started):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.serve(started))
+        self.loop.close()
+
+    async def serve(self, started):
+        self.stopping = asyncio.Event()
+        servers = [await asyncio.start_server(self.handle_client, self.host, self.port)]
+        if self.unix_path and hasattr(asyncio, 'start_unix_server'):
+            servers.append(await asyncio.start_unix_server(self.handle_client, self.unix_path))
+        print(f"Telemetry server listening on {self.host}:{self.port}")
+        started.set()
+        try:
+            while not self.stopping.is_set():
+                self.publish()
+                try:
+                    await asyncio.wait_for(self.stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for server in servers:
+                server.close()
+                await server.wait_closed()
+            for subscriber in self.subscribers:
+                subscriber.ready.set()
+            await asyncio.gather(*self.clients, return_exceptions=True)
+
+    def publish(self):
+        if self.store.count == self.published:
+            return
+        self.published, records = self.store.since(self.published)
+        if not len(records) or not self.subscribers:
+            return
+        # One encoded batch per poll is shared by every subscriber
+        message = encode_message(BATCH_MESSAGE, records.tobytes())
+        for subscriber in self.subscribers:
+            subscriber.push(message)
+
+    async def handle_client(self, reader, writer):
+        subscriber = Subscriber(writer, self.queue_size)
+        self.clients.add(asyncio.current_task())
+        try:
+            writer.write(encode_message(SCHEMA_MESSAGE, schema_payload()))
+            # Late joiners start from recent history in the in-memory store, up to exactly where the
+            # batches they are about to receive begin
+            self.publish()
+            end, snapshot = self.store.since(self.published - min(self.snapshot_size, len(self.store)))
+            snapshot = snapshot[:max(len(snapshot) - (end - self.published), 0)]
+            if len(snapshot):
+                writer.write(encode_message(BATCH_MESSAGE, snapshot.tobytes()))
+            self.subscribers.add(subscriber)
+            while not self.stopping.is_set():
+                await subscriber.ready.wait()
+                subscriber.ready.clear()
+                while subscriber.queue:
+                    writer.write(subscriber.queue.popleft())
+                    subscriber.sent += 1
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.subscribers.discard(subscriber)
+            self.clients.discard(asyncio.current_task())
+            self.total_dropped += subscriber.dropped
+            writer.close()
+
+    def stop(self):
+        if self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self.stopping.set)
+        self.thread.join()
+        self.loop = None
+
+    def stats(self):
+        return {"subscribers": len(self.subscribers),
+                "dropped": self.total_dropped + sum(subscriber.dropped for subscriber in self.subscribers)}
+
+
+def subscribe(host='127.0.0.1', port=5802):
+    # Blocking client for secondary displays and scripts: yields record batches as numpy arrays
+    with socket.create_connection((host, port)) as sock:
+        stream = sock.makefile('rb')
+        dtype = None
+        while True:
+            header = stream.read(MESSAGE_HEADER.size)
+            if len(header) < MESSAGE_HEADER.size:
+                return
+            kind, length = MESSAGE_HEADER.unpack(header)
+            payload = stream.read(length)
+            if kind == SCHEMA_MESSAGE:
+                dtype = np.dtype([(name, type_) for name, type_ in json.loads(payload)["fields"]])
+            elif kind == BATCH_MESSAGE and dtype is not None:
+                yield np.frombuffer(payload, dtype=dtype)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print telemetry from a running ground station server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5802)
+    args = parser.parse_args()
+    for batch in subscribe(args.host, args.port):
+        for record in batch:
+            print(f"#{record['PacketCount']} {record['SW_STATE']} alt {record['Altitude']:.1f} m "
+                  f"{record['Voltage']:.2f} V")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+import time
+import numpy as np
+from packetSchema import FIELDS, Packet, as_text
+
+
+# Ground-side arrival time of each packet, kept alongside the packet fields
+RECEIVED = "received"
+
+# One packet plus its arrival time as a fixed-width record, for shared memory and binary logs
+RECORD_DTYPE = np.dtype([(name, dtype) for name, dtype in FIELDS] + [(RECEIVED, np.float64)])
+
+class TelemetryStore:
+
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.count = 0
+        # Seqlock: odd while a write is in progress, so readers on other threads can detect
+        # a torn read and retry instead of taking a lock on the ingest path
+        self.sequence = 0
+        # The newest packet as an immutable tuple, swapped in whole after each write
+        self.latest_packet = None
+        self.columns = {}
+        self.dtypes = {}
+        # Every column is allocated twice over and each sample written to both halves, so any
+        # window of the last N <= capacity samples is one contiguous slice (a view, never a copy)
+        for name, dtype in FIELDS:
+            self.columns[name] = np.zeros(2 * capacity, dtype=dtype)
+            self.dtypes[name] = dtype
+        self.columns[RECEIVED] = np.zeros(2 * capacity, dtype=np.float64)
+        self.dtypes[RECEIVED] = np.float64
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, values, received=None):
+        self.sequence += 1
+        pos = self.count % self.capacity
+        for (name, dtype), value in zip(FIELDS, values):
+            column = self.columns[name]
+            column[pos] = value
+            column[pos + self.capacity] = value
+        if received is None:
+            received = time.time()
+        column = self.columns[RECEIVED]
+        column[pos] = received
+        column[pos + self.capacity] = received
+        self.count += 1
+        self.sequence += 1
+        self.latest_packet = values if isinstance(values, Packet) else Packet(*values)
+
+    def extend(self, records):
+        # Bulk append from a structured array whose field names match the columns
+        n = len(records)
+        self.sequence += 1
+        if n > self.capacity:
+            records = records[-self.capacity:]
+            self.count += n - self.capacity
+            n = self.capacity
+        pos = (self.count + np.arange(n)) % self.capacity
+        for name, column in self.columns.items():
+            column[pos] = records[name]
+            column[pos + self.capacity] = records[name]
+        self.count += n
+        self.sequence += 1
+        if n:
+            self.latest_packet = Packet(*[self.decode(records[name][-1].item()) for name, dtype in FIELDS])
+
+    def consistent(self, read):
+        # Retry read(count) until no write overlapped it
+        while True:
+            sequence = self.sequence
+            if sequence % 2 == 0:
+                result = read(self.count)
+                if self.sequence == sequence:
+                    return result
+            time.sleep(0)
+
+    def copy_records(self, count, n):
+        n = min(n, count, self.capacity)
+        end = (count - 1) % self.capacity + self.capacity + 1
+        records = np.empty(n, dtype=RECORD_DTYPE)
+        for name in RECORD_DTYPE.names:
+            records[name] = self.columns[name][end - n:end]
+        return records
+
+    def records(self, n):
+        # Copy of the last n packets as fixed-width records, all taken from the same instant
+        return self.consistent(lambda count: self.copy_records(count, n))
+
+    def since(self, start):
+        # Every packet stored after count start (at most capacity of them) and the count they run up to
+        return self.consistent(lambda count: (count, self.copy_records(count, count - start)))
+
+    def latest(self, name):
+        if self.count == 0:
+            return None
+        value = self.decode(self.columns[name][(self.count - 1) % self.capacity].item())
+        if value != value or value == '':
+            return None
+        return value
+
+    @staticmethod
+    def decode(value):
+        return as_text(value) if isinstance(value, bytes) else value
+
+    def latest_record(self):
+        return self.latest_packet
+
+    def last(self, name, n=None):
+        # Zero-copy view of the last n samples of one column; valid until the writer laps it, so readers on
+        # other threads should use records() or since() instead
+        available = len(self)
+        if n is None or n > available:
+            n = available
+        end = (self.count - 1) % self.capacity + self.capacity + 1
+        return self.columns[name][end - n:end]
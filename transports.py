@@ -0,0 +1,156 @@
+import os
+import select
+import socket
+import time
+import serial
+
+# Transports hand raw byte chunks to a FrameReader; read_chunk() returns b'' when nothing arrived
+# within the timeout (timeout=0 never blocks)
+
+
+class Transport:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def fileno(self):
+        return None
+
+    def close(self):
+        pass
+
+
+class SerialTransport(Transport):
+
+    def __init__(self, port, baud_rate=9600, timeout=0.05):
+        self.port = serial.Serial(port, baud_rate, timeout=timeout)
+
+    def read_chunk(self):
+        # Drain whatever the driver already holds; fall back to a 1 byte read so the
+        # port timeout still paces the loop when the line is idle
+        return self.port.read(self.port.in_waiting or 1)
+
+    def fileno(self):
+        return self.port.fileno()
+
+    def close(self):
+        self.port.close()
+
+
+class UdpTransport(Transport):
+
+    def __init__(self, host, port, timeout=0.05):
+        # Listens for datagrams from a radio bridge; each datagram may carry several frames
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.settimeout(timeout)
+
+    def read_chunk(self):
+        try:
+            return self.sock.recv(65536)
+        except (socket.timeout, BlockingIOError):
+            return b''
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def close(self):
+        self.sock.close()
+
+
+class TcpTransport(Transport):
+
+    def __init__(self, host, port, timeout=0.05, reconnect_interval=1.0):
+        self.address = (host, port)
+        self.timeout = timeout
+        self.reconnect_interval = reconnect_interval
+        self.sock = None
+        self.next_attempt = 0.0
+        self.connect()
+        if self.sock is None:
+            raise ConnectionError(f"Could not connect to tcp://{host}:{port}")
+
+    def connect(self):
+        self.next_attempt = time.monotonic() + self.reconnect_interval
+        try:
+            self.sock = socket.create_connection(self.address, timeout=max(self.timeout, 1.0))
+        except OSError:
+            self.sock = None
+            return
+        self.sock.settimeout(self.timeout)
+        print(f"Connected to tcp://{self.address[0]}:{self.address[1]}")
+
+    def read_chunk(self):
+        # A dropped bridge connection is retried in the background of the read loop
+        if self.sock is None:
+            if time.monotonic() >= self.next_attempt:
+                self.connect()
+            if self.sock is None:
+                time.sleep(self.timeout)
+                return b''
+        try:
+            data = self.sock.recv(65536)
+        except (socket.timeout, BlockingIOError):
+            return b''
+        if not data:
+            print(f"Connection to tcp://{self.address[0]}:{self.address[1]} closed, reconnecting")
+            self.sock.close()
+            self.sock = None
+        return data
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+class PtyTransport(Transport):
+
+    def __init__(self, timeout=0.05):
+        import tty
+        # Creates a pseudo-terminal for a bridge or simulator to write into, and reads its master side
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.timeout = timeout
+        self.name = os.ttyname(self.slave)
+        print(f"Listening on {self.name}")
+
+    def read_chunk(self):
+        if not select.select([self.master], [], [], self.timeout)[0]:
+            return b''
+        return os.read(self.master, 65536)
+
+    def fileno(self):
+        return self.master
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def split_host_port(location, default_host):
+    host, _, port = location.rpartition(':')
+    return host or default_host, int(port)
+
+
+def open_transport(address, baud_rate=9600, timeout=0.05, **options):
+    # serial port names (COM8, /dev/ttyUSB0), udp://[host]:port, tcp://host:port, pty://, replay://path.csv
+    scheme, separator, location = address.partition('://')
+    if not separator:
+        return SerialTransport(address, baud_rate, timeout)
+    if scheme == 'serial':
+        return SerialTransport(location, baud_rate, timeout)
+    if scheme == 'udp':
+        return UdpTransport(*split_host_port(location, '0.0.0.0'), timeout)
+    if scheme == 'tcp':
+        return TcpTransport(*split_host_port(location, '127.0.0.1'), timeout, **options)
+    if scheme == 'pty':
+        return PtyTransport(timeout)
+    if scheme in ('replay', 'file'):
+        from replaySerial import ReplaySerial
+        return ReplaySerial(location, baud_rate, timeout=timeout, **options)
+    raise ValueError(f"Unknown transport '{scheme}' in {address}")
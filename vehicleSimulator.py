@@ -0,0 +1,304 @@
+import argparse
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from packetSchema import TEAM_ID, TERMINATOR
+from derivedMetrics import SEA_LEVEL_HPA
+
+# Flight profile in mission seconds; after landing the vehicle idles, then a new flight starts
+PAD_TIME = 30.0
+ASCENT_RATE = 95.0
+APOGEE = 725.0
+DESCENT_RATE = 15.0
+PAYLOAD_DESCENT_RATE = 5.0
+RELEASE_ALTITUDE = 400.0
+LANDED_TIME = 60.0
+
+
+class FlightModel:
+
+    def __init__(self, seed=TEAM_ID, interval=1.0, ground_pressure=SEA_LEVEL_HPA, ground_temperature=22.0):
+        self.rng = random.Random(seed)
+        self.interval = interval  # mission seconds between packets
+        self.ground_pressure = ground_pressure
+        self.ground_temperature = ground_temperature
+        self.packet_count = 0
+        self.mission_time = 0.0
+        self.flight_time = 0.0
+        self.voltage = 8.4
+        self.spin = 0.0
+
+    def phase(self, t):
+        # (SW_STATE, PL_STATE, altitude) at t seconds into the current flight
+        ascent_end = PAD_TIME + APOGEE / ASCENT_RATE
+        release_time = ascent_end + (APOGEE - RELEASE_ALTITUDE) / DESCENT_RATE
+        landing_time = release_time + RELEASE_ALTITUDE / PAYLOAD_DESCENT_RATE
+        if t < PAD_TIME:
+            return "LAUNCH_PAD", "N", 0.0
+        if t < ascent_end:
+            return "ASCENT", "N", (t - PAD_TIME) * ASCENT_RATE
+        if t < ascent_end + 2.0:
+            return "APOGEE", "N", APOGEE - (t - ascent_end) * DESCENT_RATE
+        if t < release_time:
+            return "DESCENT", "N", APOGEE - (t - ascent_end) * DESCENT_RATE
+        if t < landing_time:
+            return "PROBE_RELEASE", "R", RELEASE_ALTITUDE - (t - release_time) * PAYLOAD_DESCENT_RATE
+        if t < landing_time + LANDED_TIME:
+            return "LANDED", "R", 0.0
+        return None, None, 0.0
+
+    def next_fields(self):
+        sw_state, pl_state, altitude = self.phase(self.flight_time)
+        if sw_state is None:
+            self.flight_time = 0.0
+            self.voltage = 8.4
+            sw_state, pl_state, altitude = self.phase(0.0)
+        rng = self.rng
+        altitude = max(altitude + rng.gauss(0, 1.5), 0.0)
+        pressure = self.ground_pressure * (1.0 - altitude / 44330.0) ** 5.255 + rng.gauss(0, 0.05)
+        temperature = self.ground_temperature - 0.0065 * altitude + rng.gauss(0, 0.2)
+        # Slow discharge with load spikes while the release mechanism fires
+        self.voltage -= 0.0004 * self.interval
+        voltage = self.voltage - (0.6 if sw_state == "PROBE_RELEASE" and rng.random() < 0.1 else 0.0)
+        spin_target = {"ASCENT": 180.0, "APOGEE": 90.0, "DESCENT": 60.0, "PROBE_RELEASE": 20.0}.get(sw_state, 0.0)
+        self.spin += (spin_target - self.spin) * 0.2
+        fields = [str(TEAM_ID), time.strftime("%H:%M:%S", time.gmtime(self.mission_time)), str(self.packet_count),
+                  sw_state, pl_state, f"{altitude:.1f}", f"{temperature:.1f}", f"{voltage + rng.gauss(0, 0.02):.2f}",
+                  f"{self.spin + rng.gauss(0, 3):.1f}", f"{rng.gauss(0, 4):.1f}", f"{rng.gauss(0, 4):.1f}",
+                  f"{pressure:.2f}"]
+        self.packet_count += 1
+        self.mission_time += self.interval
+        self.flight_time += self.interval
+        return fields
+
+
+class LinkImpairments:
+
+    def __init__(self, seed=TEAM_ID, drop=0.0, burst=0.0, burst_length=5.0, corrupt=0.0, duplicate=0.0):
+        self.rng = random.Random(seed + 1)
+        self.drop = drop
+        # Two-state fade model: a burst starts with probability `burst` and lasts burst_length packets on average
+        self.burst = burst
+        self.burst_end = 1.0 / burst_length if burst_length > 0 else 1.0
+        self.corrupt = corrupt
+        self.duplicate = duplicate
+        self.fading = False
+        self.dropped = 0
+        self.corrupted = 0
+        self.duplicated = 0
+
+    def apply(self, frame):
+        # Returns the frames that actually go on the wire for one packet
+        rng = self.rng
+        if self.fading:
+            self.fading = rng.random() >= self.burst_end
+        elif self.burst:
+            self.fading = rng.random() < self.burst
+        if self.fading or rng.random() < self.drop:
+            self.dropped += 1
+            return []
+        if rng.random() < self.corrupt:
+            self.corrupted += 1
+            frame = bytearray(frame)
+            for _ in range(rng.randint(1, 4)):
+                position = rng.randrange(len(frame))
+                if rng.random() < 0.5:
+                    frame[position] = rng.randrange(0x80, 0x100)
+                else:
+                    frame[position] ^= 1 << rng.randrange(8)
+            frame = bytes(frame)
+        if rng.random() < self.duplicate:
+            self.duplicated += 1
+            return [frame, frame]
+        return [frame]
+
+
+def encode_frame(fields):
+    return (",".join(fields) + "," + TERMINATOR + "\r\n").encode()
+
+
+class PtyOutput:
+
+    def __init__(self):
+        import tty
+        self.master, self.slave = os.openpty()
+        # Raw mode so the line discipline passes frames through untouched
+        tty.setraw(self.slave)
+        self.name = os.ttyname(self.slave)
+
+    def write(self, data):
+        os.write(self.master, data)
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+
+class TcpOutput:
+
+    def __init__(self, host, port):
+        self.server = socket.create_server((host, port))
+        self.name = f"tcp://{host}:{port}"
+        self.client = None
+
+    def write(self, data):
+        if self.client is None:
+            print(f"Waiting for a connection on {self.name}")
+            self.client, address = self.server.accept()
+            print(f"Client connected from {address[0]}:{address[1]}")
+        try:
+            self.client.sendall(data)
+        except OSError:
+            self.client.close()
+            self.client = None
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+        self.server.close()
+
+
+class UdpOutput:
+
+    def __init__(self, host, port):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.address = (host, port)
+        self.name = f"udp://{host}:{port}"
+
+    def write(self, data):
+        self.sock.sendto(data, self.address)
+
+    def close(self):
+        self.sock.close()
+
+
+class FileOutput:
+
+    def __init__(self, path):
+        self.file = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        self.name = path
+
+    def write(self, data):
+        self.file.write(data)
+
+    def close(self):
+        self.file.flush()
+        if self.file is not sys.stdout.buffer:
+            self.file.close()
+
+
+class Simulator:
+
+    def __init__(self, output, model, impairments, rate=1.0, baud=None, packets=None):
+        self.output = output
+        self.model = model
+        self.impairments = impairments
+        self.rate = rate  # packets per wall-clock second, 0 for as fast as the output takes them
+        self.baud = baud  # when set, paced to the line speed of an 8N1 serial link at this baud
+        self.packets = packets
+        self.running = False
+        self.sent = 0
+        self.bytes_sent = 0
+
+    def done(self):
+        return not self.running or (self.packets is not None and self.model.packet_count >= self.packets)
+
+    def frame_interval(self, frame):
+        interval = 1.0 / self.rate if self.rate else 0.0
+        if self.baud:
+            interval = max(interval, len(frame) * 10.0 / self.baud)
+        return interval
+
+    def run(self, stats_interval=5.0):
+        self.running = True
+        start = last_stats = due = time.perf_counter()
+        # Frames due within the next few ms share one write, so high rates don't cost a syscall per packet
+        batch_window = 0.005
+        while not self.done():
+            chunk = bytearray()
+            while not self.done():
+                send_at = due
+                frame = encode_frame(self.model.next_fields())
+                for wire in self.impairments.apply(frame):
+                    chunk += wire
+                due += self.frame_interval(frame)
+                if len(chunk) >= 4096 or due > time.perf_counter() + batch_window:
+                    break
+            delay = send_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if chunk:
+                self.output.write(bytes(chunk))
+                self.bytes_sent += len(chunk)
+            self.sent = self.model.packet_count
+
+            now = time.perf_counter()
+            if stats_interval and now - last_stats >= stats_interval:
+                print(self.format_stats(now - start))
+                last_stats = now
+        return self.format_stats(time.perf_counter() - start)
+
+    def stop(self):
+        self.running = False
+
+    def format_stats(self, elapsed):
+        impairments = self.impairments
+        return (f"{self.sent} packets in {elapsed:.1f} s ({self.sent / elapsed if elapsed else 0:.1f}/s, "
+                f"{self.bytes_sent / 1024 / elapsed if elapsed else 0:.1f} KiB/s), dropped {impairments.dropped}, "
+                f"corrupted {impairments.corrupted}, duplicated {impairments.duplicated}")
+
+
+def open_output(args):
+    if args.tcp:
+        host, _, port = args.tcp.rpartition(':')
+        return TcpOutput(host or '127.0.0.1', int(port))
+    if args.udp:
+        host, _, port = args.udp.rpartition(':')
+        return UdpOutput(host or '127.0.0.1', int(port))
+    if args.file:
+        return FileOutput(args.file)
+    if not hasattr(os, 'openpty'):
+        raise SystemExit("No pty on this platform; use --tcp, --udp or --file")
+    return PtyOutput()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated Taternauts vehicle for load and soak testing")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--tcp', metavar='[HOST:]PORT', help="serve frames to one TCP client")
+    output.add_argument('--udp', metavar='[HOST:]PORT', help="send frames as UDP datagrams")
+    output.add_argument('--file', help="write frames to a file, or - for stdout")
+    parser.add_argument('--rate', type=float, default=1.0, help="packets per second, 0 for as fast as possible")
+    parser.add_argument('--baud', type=int, help="never exceed the line speed of a serial link at this baud")
+    parser.add_argument('--packets', type=int, help="stop after this many packets (default: run until stopped)")
+    parser.add_argument('--interval', type=float, default=1.0, help="mission seconds between packets")
+    parser.add_argument('--drop', type=float, default=0.0, help="probability of losing a packet")
+    parser.add_argument('--burst', type=float, default=0.0, help="probability per packet of a fade starting")
+    parser.add_argument('--burst-length', type=float, default=5.0, help="mean fade length in packets")
+    parser.add_argument('--corrupt', type=float, default=0.0, help="probability of corrupting a packet's bytes")
+    parser.add_argument('--duplicate', type=float, default=0.0, help="probability of sending a packet twice")
+    parser.add_argument('--seed', type=int, default=TEAM_ID)
+    parser.add_argument('--stats-interval', type=float, default=5.0)
+    args = parser.parse_args()
+
+    sink = open_output(args)
+    print(f"Simulating vehicle on {sink.name}", file=sys.stderr if args.file == '-' else sys.stdout)
+    model = FlightModel(args.seed, args.interval)
+    impairments = LinkImpairments(args.seed, args.drop, args.burst, args.burst_length, args.corrupt, args.duplicate)
+    simulator = Simulator(sink, model, impairments, args.rate, args.baud, args.packets)
+
+    signal.signal(signal.SIGINT, lambda *_: simulator.stop())
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, lambda *_: simulator.stop())
+    try:
+        summary = simulator.run(0 if args.file == '-' else args.stats_interval)
+    finally:
+        sink.close()
+    print(summary, file=sys.stderr if args.file == '-' else sys.stdout)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,7 @@
+from telemetryGraph import TelemetryGraph
+
+
+class VerticalSpeedGraph(TelemetryGraph):
+    def __init__(self, window=20):
+        super().__init__("Vertical Speed", [("Smoothed", 'c'), ("Kalman", 'k')], [-50, 50], window)
+        self.plot.setLabel('left', 'Vertical Speed', 'm/s')
\ No newline at end of file